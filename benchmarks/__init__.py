@@ -0,0 +1,4 @@
+"""Benchmarks for artfight-api, run against a local stub of artfight.net.
+
+Run every suite with `python -m benchmarks`, see `python -m benchmarks --help` for options.
+"""
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+from benchmarks import client, data, parsers, startup  # noqa: F401 registers the suites
+from benchmarks.harness import HEADER, Context, Result, compare, format_result, select
+from benchmarks.stub import StubProcess
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Runs the artfight-api benchmarks.")
+    parser.add_argument("patterns", nargs="*", help="suites or glob patterns of benchmarks to run, by default all")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument(
+        "--base-url",
+        help="request an already running server instead of starting stub servers, stub options are then ignored",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the size of every benchmark")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass measuring peak memory")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="a previous --json report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1, help="the relative change counted as a regression")
+    args = parser.parse_args()
+
+    benchmarks = select(args.patterns)
+    if args.list:
+        for bench in benchmarks:
+            print(bench.name)
+        return 0
+    if not benchmarks:
+        print("No benchmarks match", file=sys.stderr)
+        return 1
+
+    stubs: Dict[tuple, StubProcess] = {}
+    results: List[Result] = []
+    print(HEADER, flush=True)
+    try:
+        for bench in benchmarks:
+            if bench.stub is None:
+                context = Context(None, args.scale)
+            elif args.base_url is not None:
+                context = Context(args.base_url, args.scale)
+            else:
+                # one server per configuration, shared by the benchmarks needing it
+                key = bench.stub.key()
+                if key not in stubs:
+                    stubs[key] = StubProcess(bench.stub)
+                context = Context(stubs[key].base_url, args.scale, bench.stub)
+
+            result = bench.run(context, memory=not args.no_memory)
+            results.append(result)
+            print(format_result(result), flush=True)
+    finally:
+        for stub in stubs.values():
+            stub.close()
+
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({result.name: result.to_dict() for result in results}, f, indent=2)
+
+    failed = False
+    for result in results:
+        for failure in result.failures:
+            print(f"FAILED {result.name}: {failure}", file=sys.stderr)
+            failed = True
+
+    if args.compare is not None:
+        regressions = compare(results, args.compare, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
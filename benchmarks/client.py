@@ -0,0 +1,345 @@
+"""Fetches users and attacks from the stub server through `ArtfightClient`."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from artfight import (
+    ArtfightClient,
+    Metrics,
+    ObjectStore,
+    RequestScheduler,
+    ResponseCache,
+    RetryPolicy,
+    SyncArtfightClient,
+)
+from artfight.error import UnauthorizedError
+from benchmarks.harness import Context, Timer, benchmark
+from benchmarks.stub import ATTACK_STRIDE, PER_PAGE, StubOptions
+
+# A server which answers immediately, isolating the client's own overhead.
+FAST = StubOptions()
+# A server with a realistic round trip, where concurrency pays off.
+SLOW = StubOptions(latency=0.02)
+# Users with ten pages of attacks.
+PAGED = StubOptions(attacks=300, latency=0.02)
+# Pages sent in slow chunks, as over a poor connection.
+TRICKLE = StubOptions(attacks=300, chunk_delay=0.005)
+# Users with only a few attacks each, for crawling.
+GRAPH = StubOptions(attacks=10)
+# A server which fails 5% of requests and expires sessions every 50 requests.
+FAULTY = StubOptions(error_rate=0.05, session_requests=50)
+# A server expiring sessions every 3 requests.
+SHORT_SESSIONS = StubOptions(session_requests=3)
+# Users with a single page of attacks, behind a realistic round trip.
+ONE_PAGE = StubOptions(attacks=10, latency=0.02)
+
+# The labels of a page request redirected to the login.
+EXPIRED = {"method": "GET", "status": "302"}
+
+
+def client(context: Context, **options: Any) -> ArtfightClient:
+    return ArtfightClient("benchmark", "benchmark", base_url=context.base_url, **options)  # type: ignore
+
+
+def attack_ids(count: int, users: int = 1000, attacks: int = 90) -> list:
+    """Returns distinct attack ids spread across users."""
+    return [(i % users) * ATTACK_STRIDE + i // users % attacks + 1 for i in range(count)]
+
+
+def sequential(name: str, stub: StubOptions, count: int, **options: Any) -> None:
+    @benchmark("client", name, stub)
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        async with client(context, **options) as c:
+            await c.http.login()
+            timer.begin()
+            for id in attack_ids(context.n(count)):
+                with timer.time():
+                    await c.fetch_attack(id)
+            timer.end()
+        return None
+
+
+@benchmark("client", "fetch_user", FAST)
+async def fetch_user(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    async with client(context) as c:
+        await c.http.login()
+        timer.begin()
+        for i in range(context.n(300)):
+            with timer.time():
+                await c.fetch_user(f"user{i % 1000}")
+        timer.end()
+    return None
+
+
+sequential("fetch_attack", FAST, 300)
+sequential("fetch_attack[lazy_fields]", FAST, 300, lazy_fields=True)
+sequential("fetch_attack[metrics]", FAST, 300, metrics=Metrics())
+sequential("fetch_attack[latency=20ms]", SLOW, 50)
+
+
+@benchmark("client", "fetch_attack[cold_pool]", FAST)
+async def fetch_attack_cold_pool(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    # a new client, and so a new connection and login, for every fetch
+    for id in attack_ids(context.n(50)):
+        with timer.time():
+            async with client(context) as c:
+                await c.fetch_attack(id)
+    return None
+
+
+def many(name: str, stub: StubOptions, count: int, concurrency: int, **options: Any) -> None:
+    @benchmark("client", name, stub)
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        errors = 0
+        async with client(context, **options) as c:
+            await c.http.login()
+            timer.begin()
+            ids = attack_ids(context.n(count))
+            async for _, result in c.fetch_attacks_many(ids, concurrency=concurrency):
+                errors += isinstance(result, Exception)
+                timer.count()
+            timer.end()
+        return {"errors": errors}
+
+
+many("fetch_attacks_many[latency=20ms]", SLOW, 400, 8)
+many("fetch_attacks_many[latency=20ms,thread]", SLOW, 400, 8, parse_executor="thread")
+many("fetch_attacks_many[latency=20ms,process]", SLOW, 400, 8, parse_executor="process")
+many("fetch_attacks_many[fast]", FAST, 400, 8)
+
+
+def pages(name: str, stub: StubOptions, users: int = 10, **options: Any) -> None:
+    @benchmark("client", name, stub)
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        first = []
+        async with client(context) as c:
+            await c.http.login()
+            timer.begin()
+            for i in range(context.n(users)):
+                attacks = 0
+                with timer.time():
+                    start = time.perf_counter()
+                    async for _ in c.get_user(f"user{i}").fetch_attacks(**options):
+                        if len(first) == i:
+                            first.append(time.perf_counter() - start)
+                        attacks += 1
+                timer.check(attacks == stub.attacks, f"user{i} has {stub.attacks} attacks, got {attacks}")
+            timer.end()
+        return {"first_result_ms": sum(first) / len(first) * 1000}
+
+
+# Sequential and prefetched fetches side by side, prefetching only pays off once lists span several pages.
+for count in (1, 5, 20, 50):
+    # fewer users for longer lists, keeping each benchmark to a similar number of requests
+    stub, users = StubOptions(attacks=count * PER_PAGE, latency=0.02), max(2, 50 // count)
+    pages(f"fetch_attacks[pages={count}]", stub, users)
+    pages(f"fetch_attacks[pages={count},prefetch=4]", stub, users, prefetch=4)
+
+pages("fetch_attacks[trickle]", TRICKLE)
+pages("fetch_attacks[trickle,stream]", TRICKLE, stream=True)
+
+
+@benchmark("client", "fetch_attack[cache_warm]", FAST)
+async def fetch_attack_cache_warm(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    ids = attack_ids(context.n(300))
+    async with client(context, cache=ResponseCache(maxsize=len(ids))) as c:
+        for id in ids:
+            await c.fetch_attack(id)
+        timer.begin()
+        for id in ids:
+            with timer.time():
+                await c.fetch_attack(id)
+        timer.end()
+    return None
+
+
+@benchmark("client", "fetch_attack[store_warm]", FAST)
+async def fetch_attack_store_warm(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    ids = attack_ids(context.n(300))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "store.db")
+        with ObjectStore(path) as store:
+            async with client(context, store=store) as c:
+                for id in ids:
+                    await c.fetch_attack(id)
+
+        # a restart, the store is all that survives
+        with ObjectStore(path) as store:
+            async with client(context, store=store) as c:
+                timer.begin()
+                for id in ids:
+                    with timer.time():
+                        await c.fetch_attack(id)
+                timer.end()
+    return None
+
+
+@benchmark("client", "sync_attacks[unchanged]", PAGED)
+async def sync_attacks_unchanged(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    metrics = Metrics()
+    users = context.n(10)
+    with ObjectStore() as store:
+        async with client(context, store=store, metrics=metrics) as c:
+            for i in range(users):
+                await c.get_user(f"user{i}").sync_attacks()
+            metrics.reset()
+            timer.begin()
+            for i in range(users):
+                with timer.time():
+                    await c.get_user(f"user{i}").sync_attacks()
+            timer.end()
+
+    requests = sum(s["value"] for s in metrics.snapshot().get("artfight_requests_total", ()))
+    return {"requests_per_sync": requests / users}
+
+
+@benchmark("client", "crawl", GRAPH)
+async def crawl(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    users = 0
+    async with client(context) as c:
+        await c.http.login()
+        timer.begin()
+        async for event in c.crawl(["user0"], max_users=context.n(100), concurrency=8):
+            kind = getattr(event, "kind", None)
+            if kind == "attack":
+                timer.count()
+            users += kind == "user"
+        timer.end()
+    return {"users": users}
+
+
+@benchmark("client", "fetch_attack[faults]", FAULTY)
+async def fetch_attack_faults(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    metrics = Metrics()
+    retry = RetryPolicy(base=0.005, cap=0.05)
+    async with client(context, metrics=metrics, retry=retry) as c:
+        await c.http.login()
+        timer.begin()
+        for id in attack_ids(context.n(300)):
+            with timer.time():
+                await c.fetch_attack(id)
+        timer.end()
+
+    snapshot = metrics.snapshot()
+    logins = sum(s["value"] for s in snapshot.get("artfight_logins_total", ()))
+    # every redirect of a page request to the login is an expired session
+    requests = snapshot.get("artfight_requests_total", ())
+    expired = sum(s["value"] for s in requests if s["labels"] == EXPIRED)
+    timer.check(logins == 1 + expired, f"{int(logins)} logins for {int(expired)} expired sessions")
+    return {"retries": retry.retries, "logins": int(logins)}
+
+
+@benchmark("client", "concurrent_first_requests", FAST)
+async def concurrent_first_requests(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    metrics = Metrics()
+    # many requests racing the initial login and connection setup
+    async with client(context, metrics=metrics) as c:
+        ids = attack_ids(context.n(100))
+
+        async def fetch(id: int) -> None:
+            with timer.time():
+                await c.fetch_attack(id)
+
+        await asyncio.gather(*map(fetch, ids))
+
+    logins = sum(s["value"] for s in metrics.snapshot().get("artfight_logins_total", ()))
+    timer.check(logins == 1, f"{int(logins)} logins for {len(ids)} concurrent first requests")
+    return {"logins": int(logins)}
+
+
+@benchmark("client", "concurrent_expiring_sessions", SHORT_SESSIONS)
+async def concurrent_expiring_sessions(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    # sessions expire before every waiting request has used them, so requests must log in repeatedly
+    errors = 0
+    scheduler = RequestScheduler(max_in_flight=1)
+    async with client(context, scheduler=scheduler) as c:
+        await c.http.login()
+
+        async def fetch(id: int) -> None:
+            nonlocal errors
+            with timer.time():
+                try:
+                    await c.fetch_attack(id)
+                except UnauthorizedError:
+                    errors += 1
+
+        for _ in range(context.n(5)):
+            await asyncio.gather(*map(fetch, attack_ids(20)))
+
+    timer.check(errors == 0, f"{errors} requests were unauthorized")
+    return {"errors": errors}
+
+
+@benchmark("client", "abandoned_iterations", ONE_PAGE)
+async def abandoned_iterations(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    # iterations ended early must cancel their queued requests rather than leave them to be sent afterwards
+    metrics = Metrics()
+    iterations = context.n(10)
+    async with client(context, metrics=metrics, scheduler=RequestScheduler(max_in_flight=1)) as c:
+        await c.http.login()
+        for i in range(iterations):
+            with timer.time():
+                async for _ in c.get_user(f"user{i}").fetch_attacks(prefetch=8):
+                    pass
+                async for _ in c.fetch_attacks_many(attack_ids(10, attacks=10), concurrency=10):
+                    break
+        # give any request which wasn't cancelled time to be sent
+        await asyncio.sleep(0.1)
+
+    sent = sum(s["value"] for s in metrics.snapshot().get("artfight_requests_total", ())) - 1
+    # a page or attack, and at most one more which took the freed slot as the iteration ended, per loop
+    timer.check(sent <= 4 * iterations, f"{int(sent)} requests sent for {iterations} early ended iterations")
+    return {"requests_per_iteration": sent / iterations}
+
+
+def blocking(name: str, stub: StubOptions, count: int, threads: int, persistent: bool) -> None:
+    """Fetches attacks from synchronous code, on `threads` threads at once."""
+
+    @benchmark("client", name, stub)
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        metrics = Metrics()
+        ids = attack_ids(context.n(count))
+
+        def timed(fetch: Callable[[int], Any]) -> Callable[[int], None]:
+            def call(id: int) -> None:
+                with timer.time():
+                    fetch(id)
+
+            return call
+
+        def work() -> None:
+            if persistent:
+                options = {"base_url": context.base_url, "metrics": metrics}
+                with SyncArtfightClient("benchmark", "benchmark", **options) as c:  # type: ignore
+                    timer.begin()
+                    with ThreadPoolExecutor(threads) as pool:
+                        list(pool.map(timed(c.fetch_attack), ids))
+                    timer.end()
+                return
+
+            # the pattern it replaces, a new loop, and so a new client, for every call
+            async def fetch(id: int) -> None:
+                async with client(context, metrics=metrics) as c:
+                    await c.fetch_attack(id)
+
+            timer.begin()
+            with ThreadPoolExecutor(threads) as pool:
+                list(pool.map(timed(lambda id: asyncio.run(fetch(id))), ids))
+            timer.end()
+
+        # blocking calls can't be made from the harness's loop
+        await asyncio.get_running_loop().run_in_executor(None, work)
+        logins = sum(s["value"] for s in metrics.snapshot().get("artfight_logins_total", ()))
+        return {"logins": int(logins)}
+
+
+blocking("blocking_fetch[asyncio.run]", FAST, 100, 1, persistent=False)
+blocking("blocking_fetch[sync_client]", FAST, 100, 1, persistent=True)
+blocking("blocking_fetch[asyncio.run,threads=8,latency=20ms]", SLOW, 200, 8, persistent=False)
+blocking("blocking_fetch[sync_client,threads=8,latency=20ms]", SLOW, 200, 8, persistent=True)
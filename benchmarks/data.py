@@ -0,0 +1,106 @@
+"""Holds, exports and aggregates large numbers of attacks without any network."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from artfight.aggregate import AttackAggregator
+from artfight.export import AttackExporter, read_npz
+from artfight.http import HTTPClient
+from artfight.object import PartialAttack, PartialUser
+from artfight.object.attack import AttackParser
+from benchmarks.harness import Context, Timer, benchmark
+from benchmarks.stub import attack_page
+
+TEAMS = ("Fluffy", "Fangs", "Scales")
+USERS = 20_000
+
+_BASE = AttackParser.parse(attack_page(1), 1)
+
+
+def attacks(count: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Generates the parser output of `count` attacks, spread across users, teams and a month."""
+    start = datetime(2023, 7, 1)
+    for i in range(count):
+        parsed = dict(_BASE)
+        parsed["attacker"] = f"user{i * 7 % USERS}"
+        parsed["defender"] = f"user{i * 13 % USERS}"
+        parsed["team"] = TEAMS[i % 3]
+        parsed["points"] = float(i % 40)
+        parsed["date_submitted"] = start + timedelta(minutes=i % 44640)
+        yield i, parsed
+
+
+@benchmark("data", "partial_attacks")
+async def partial_attacks(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    http = HTTPClient("benchmark", "benchmark")
+    count = context.n(1_000_000)
+    held = [PartialAttack(i, http) for i in range(count)]
+    timer.count(len(held))
+    return None
+
+
+@benchmark("data", "user_references")
+async def user_references(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    # the attacker and defender of every attack in a crawl, across ten thousand users
+    http = HTTPClient("benchmark", "benchmark")
+    count = context.n(1_000_000)
+    held = [PartialUser.intern(f"user{i % 10_000}", http) for i in range(count)]
+    timer.count(len(held))
+    return {"instances": len(http.interned)}
+
+
+def export(format: Any) -> None:
+    @benchmark("data", f"export[{format}]")
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        count = context.n(200_000)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "attacks")
+            with AttackExporter(path, format) as exporter:
+                for id, parsed in attacks(count):
+                    exporter.add_parsed(id, parsed)
+            timer.count(count)
+        return None
+
+
+if importlib.util.find_spec("pyarrow") is not None:
+    export("parquet")
+if importlib.util.find_spec("numpy") is not None:
+    export("npz")
+
+
+def aggregate(numpy: bool) -> None:
+    @benchmark("data", f"aggregate[{'numpy' if numpy else 'python'}]")
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        count = context.n(1_000_000)
+        aggregator = AttackAggregator(numpy=numpy)
+        for id, parsed in attacks(count):
+            aggregator.add_parsed(id, parsed)
+        aggregator.flush()
+        timer.count(count)
+        return {"users": len(aggregator.user_points())}
+
+
+aggregate(numpy=False)
+if importlib.util.find_spec("numpy") is not None:
+    aggregate(numpy=True)
+
+    @benchmark("data", "aggregate[columns]")
+    async def aggregate_columns(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        count = context.n(1_000_000)
+        with tempfile.TemporaryDirectory() as directory:
+            with AttackExporter(directory, "npz") as exporter:
+                for id, parsed in attacks(count):
+                    exporter.add_parsed(id, parsed)
+            columns = read_npz(directory)
+
+        timer.begin()
+        aggregator = AttackAggregator()
+        aggregator.add_columns(columns)
+        timer.count(count)
+        timer.end()
+        return {"users": len(aggregator.user_points())}
@@ -0,0 +1,266 @@
+"""Runs benchmarks and reports their throughput, latency percentiles and peak memory."""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import gc
+import json
+import math
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.stub import StubOptions
+
+__all__ = ("Benchmark", "Context", "Result", "Timer", "BENCHMARKS", "benchmark", "select")
+
+
+class Timer:
+    """Records the operations performed by a benchmark."""
+
+    def __init__(self) -> None:
+        self.started: Optional[float] = None
+        self.stopped: Optional[float] = None
+        self.latencies: List[float] = []
+        self.operations: int = 0
+        self.failures: List[str] = []
+
+    def begin(self) -> None:
+        """Starts the measured window, excluding any setup before it from throughput."""
+        self.started = time.perf_counter()
+
+    def end(self) -> None:
+        """Ends the measured window, excluding any cleanup after it from throughput."""
+        self.stopped = time.perf_counter()
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Times a single operation."""
+        start = time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter() - start)
+        self.operations += 1
+
+    def record(self, latency: float) -> None:
+        """Records an operation timed by the benchmark itself."""
+        self.latencies.append(latency)
+        self.operations += 1
+
+    def count(self, operations: int = 1) -> None:
+        """Records operations which are not timed individually, such as items of a stream."""
+        self.operations += operations
+
+    def check(self, condition: bool, message: str) -> bool:
+        """Records a failure unless `condition` holds, failing the run once every benchmark has reported."""
+        if not condition:
+            self.failures.append(message)
+        return condition
+
+
+class Context:
+    """What a benchmark is run against.
+
+    Parameters
+    ----------
+    base_url : str
+        The url of the server to request, `None` for benchmarks which don't need one.
+    scale : float
+        The multiplier applied to the size of every benchmark.
+    stub : StubOptions, optional
+        The options of the stub server at `base_url`, if it was started by the harness.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str],
+        scale: float,
+        stub: Optional[StubOptions] = None,
+    ) -> None:
+        self.base_url: Optional[str] = base_url
+        self.stub: Optional[StubOptions] = stub
+        self.scale: float = scale
+
+    def n(self, count: int) -> int:
+        """Scales a number of operations, never below 1."""
+        return max(1, int(count * self.scale))
+
+
+BenchmarkFunc = Callable[[Context, Timer], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class Benchmark:
+    """A registered benchmark.
+
+    Parameters
+    ----------
+    name : str
+        The name of the benchmark, prefixed by its suite.
+    func : BenchmarkFunc
+        The coroutine function running the benchmark, it may return extra figures to report.
+    stub : StubOptions, optional
+        The stub server the benchmark needs, `None` if it doesn't make requests.
+    """
+
+    def __init__(self, name: str, func: BenchmarkFunc, stub: Optional[StubOptions]) -> None:
+        self.stub: Optional[StubOptions] = stub
+        self.func: BenchmarkFunc = func
+        self.name: str = name
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name!r}>"
+
+    def run(self, context: Context, memory: bool = True) -> Result:
+        """Runs the benchmark, then runs it again under tracemalloc to measure its peak memory."""
+        gc.collect()
+        timer = Timer()
+        start = time.perf_counter()
+        extra = asyncio.run(self.func(context, timer))
+        stop = time.perf_counter()
+        seconds = (timer.stopped or stop) - (timer.started or start)
+
+        peak = None
+        if memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                asyncio.run(self.func(context, Timer()))
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        result = Result(self.name, timer.operations, seconds, timer.latencies, peak, extra or {})
+        result.failures = timer.failures
+        return result
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(
+    suite: str,
+    name: str,
+    stub: Optional[StubOptions] = None,
+) -> Callable[[BenchmarkFunc], BenchmarkFunc]:
+    """Registers a benchmark.
+
+    Parameters
+    ----------
+    suite : str
+        The suite the benchmark belongs to.
+    name : str
+        The name of the benchmark within its suite.
+    stub : StubOptions, optional
+        The stub server the benchmark needs, by default it doesn't make requests.
+    """
+
+    def decorator(func: BenchmarkFunc) -> BenchmarkFunc:
+        BENCHMARKS.append(Benchmark(f"{suite}.{name}", func, stub))
+        return func
+
+    return decorator
+
+
+def select(patterns: List[str]) -> List[Benchmark]:
+    """Returns the benchmarks matching any of the provided glob patterns, or a suite name."""
+    if not patterns:
+        return list(BENCHMARKS)
+    result = []
+    for bench in BENCHMARKS:
+        suite = bench.name.split(".", 1)[0]
+        if any(p == suite or fnmatch.fnmatchcase(bench.name, p) for p in patterns):
+            result.append(bench)
+    return result
+
+
+class Result:
+    """The measurements of a benchmark run."""
+
+    def __init__(
+        self,
+        name: str,
+        operations: int,
+        seconds: float,
+        latencies: List[float],
+        peak: Optional[int],
+        extra: Dict[str, Any],
+    ) -> None:
+        self.latencies: List[float] = sorted(latencies)
+        self.operations: int = operations
+        self.extra: Dict[str, Any] = extra
+        self.peak: Optional[int] = peak
+        self.seconds: float = seconds
+        self.name: str = name
+        self.failures: List[str] = []
+
+    @property
+    def throughput(self) -> float:
+        """The number of operations per second."""
+        return self.operations / self.seconds if self.seconds else math.inf
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Returns the latency below which the provided fraction of operations completed."""
+        if not self.latencies:
+            return None
+        index = min(len(self.latencies) - 1, max(0, math.ceil(q * len(self.latencies)) - 1))
+        return self.latencies[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operations": self.operations,
+            "seconds": self.seconds,
+            "throughput": self.throughput,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "peak_bytes": self.peak,
+            "failures": self.failures,
+            **self.extra,
+        }
+
+
+HEADER = f"{'benchmark':<48} {'ops':>8} {'ops/s':>11} {'p50 ms':>9} {'p99 ms':>9} {'peak MiB':>9}"
+
+
+def format_result(result: Result) -> str:
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.3f}"
+
+    peak = "-" if result.peak is None else f"{result.peak / 2**20:.1f}"
+    line = (
+        f"{result.name:<48} {result.operations:>8} {result.throughput:>11.1f} "
+        f"{ms(result.percentile(0.5)):>9} {ms(result.percentile(0.99)):>9} {peak:>9}"
+    )
+    if result.extra:
+        line += "  " + " ".join(f"{k}={_format_extra(v)}" for k, v in result.extra.items())
+    if result.failures:
+        line += f"  FAILED {len(result.failures)} checks"
+    return line
+
+
+def _format_extra(value: Any) -> str:
+    return f"{value:.3g}" if isinstance(value, float) else str(value)
+
+
+def compare(results: List[Result], baseline_path: str, threshold: float) -> List[str]:
+    """Compares results against a previous `--json` report, returning a message per regression.
+
+    Throughput falling, or p99 latency or peak memory rising, by more than `threshold` is a regression.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline: Dict[str, Dict[str, Any]] = json.load(f)
+
+    regressions = []
+    for result in results:
+        before = baseline.get(result.name)
+        if before is None:
+            continue
+        after = result.to_dict()
+        checks = (("throughput", -1), ("p99", 1), ("peak_bytes", 1))
+        for key, direction in checks:
+            old, new = before.get(key), after.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change * direction > threshold:
+                regressions.append(f"{result.name}: {key} {old:.4g} -> {new:.4g} ({change:+.1%})")
+    return regressions
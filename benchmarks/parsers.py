@@ -0,0 +1,293 @@
+"""Parses the fixtures without any network, per page kind and parser engine."""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from artfight.object.attack import AttackParser
+from artfight.object.user import AttackListFeed, AttackListParser, ProfileParser
+from artfight.parser import BaseParser, LazyFields
+from benchmarks.harness import Context, Timer, benchmark
+from benchmarks.stub import attack_list_page, attack_page, profile_page
+
+ENGINES: List[Any] = ["html.parser"]
+if importlib.util.find_spec("lxml") is not None:
+    ENGINES.append("lxml")
+
+# The parser, page and parser arguments of each page kind.
+PAGES: Dict[str, Tuple[Type[BaseParser[Any]], str, Tuple[Any, ...]]] = {
+    "profile": (ProfileParser, profile_page("user1"), ("user1",)),
+    "attack": (AttackParser, attack_page(100001), (100001,)),
+    "attack_list": (AttackListParser, attack_list_page(1, 1), ("user1", 1)),
+}
+
+ITERATIONS = 500
+
+SEEN = '<span title="12 July 2023 04:05:06 PM">1 hour ago</span>'
+CHARACTERS = re.compile(r"<tr><td>Characters:</td><td>.*?</td></tr>")
+
+
+def golden() -> Dict[str, Dict[str, str]]:
+    """Returns pages of each kind, covering the optional fields and list states every engine must parse alike."""
+    profile, attack = PAGES["profile"][1], PAGES["attack"][1]
+    link = re.compile(r"<tr><td>(?!Twitter)\w+:</td>.*?</tr>\n")
+
+    def characters(cell: str) -> str:
+        return CHARACTERS.sub(f"<tr><td>Characters:</td><td>{cell}</td></tr>", attack)
+
+    return {
+        "profile": {
+            "seen": profile,
+            "never_seen": profile.replace(SEEN, "Never"),
+            "single_link": link.sub("", profile),
+            "no_links": re.sub(r"<tr>.*?</tr>\n", "", profile),
+        },
+        "attack": {
+            "characters": attack,
+            "single_character": characters('<a href="/character/11.foo"><i>Foo</i></a>'),
+            "no_characters": characters(""),
+            "unlinked_character": characters('<a><i>Foo</i></a> <a href="/team/1"><i>Fluffy</i></a>'),
+            "plain_points": attack.replace(' <span class="text-muted">(full body + colour + background)</span>', ""),
+        },
+        "attack_list": {
+            "first": attack_list_page(1, 1),
+            "middle": attack_list_page(1, 2),
+            "last": attack_list_page(1, 3),
+            "partial_last": attack_list_page(1, 2, attacks=45),
+            "single": attack_list_page(1, 1, attacks=1),
+            "empty": attack_list_page(1, 1, attacks=0),
+        },
+    }
+
+
+def document(parser: Type[BaseParser[Any]]) -> Callable[..., Any]:
+    """Returns the function parsing a page by building its tree, skipping any fast path."""
+    return getattr(parser, "parse_document", parser.parse)
+
+
+def full_tree(parser: Type[BaseParser[Any]]) -> Type[BaseParser[Any]]:
+    """Returns a copy of a parser which builds the whole document instead of only its regions."""
+    return type(f"FullTree{parser.__name__}", (parser,), {"_REGIONS": None})  # type: ignore
+
+
+def register(kind: str, engine: Any, whole: bool) -> None:
+    parser, page, args = PAGES[kind]
+    name = f"{kind}_full_tree" if whole else kind
+    if whole:
+        parser = full_tree(parser)
+
+    @benchmark("parse", f"{name}[{engine}]")
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        reference = document(PAGES[kind][0])(page, *args, engine="html.parser")
+        parse = document(parser)
+        result = None
+        timer.begin()
+        for _ in range(context.n(ITERATIONS)):
+            with timer.time():
+                result = parse(page, *args, engine=engine)
+        timer.check(result == reference, f"{engine} gave {result!r}, not {reference!r}")
+        return {"chars": len(page)}
+
+
+for kind in PAGES:
+    for engine in ENGINES:
+        register(kind, engine, whole=False)
+        register(kind, engine, whole=True)
+
+
+def register_lazy(engine: Any) -> None:
+    page, args = PAGES["attack"][1:]
+
+    @benchmark("parse", f"attack_lazy_subset[{engine}]")
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        # the fields a crawl reads, the rest are never extracted
+        reference = AttackParser.parse(page, *args, engine="html.parser")
+        values = None
+        timer.begin()
+        for _ in range(context.n(ITERATIONS)):
+            with timer.time():
+                fields = LazyFields(AttackParser.soup(page, engine), AttackParser._FIELDS)  # type: ignore
+                values = fields["attacker"], fields["defender"]
+        expected = reference["attacker"], reference["defender"]
+        timer.check(values == expected, f"{engine} gave {values!r}, not {expected!r}")
+        return None
+
+
+for engine in ENGINES:
+    register_lazy(engine)
+
+
+def register_golden(engine: Any) -> None:
+    @benchmark("parse", f"golden[{engine}]")
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        # every page parsed the same as a full html.parser tree, by regions and in full
+        cases = []
+        for kind, pages in golden().items():
+            parser, _, args = PAGES[kind]
+            parsers = document(parser), document(full_tree(parser))
+            for name, page in pages.items():
+                reference = document(parser)(page, *args, engine="html.parser")
+                cases.append((f"{kind}/{name}", page, args, reference, parsers))
+
+        mismatches = set()
+        timer.begin()
+        for _ in range(context.n(ITERATIONS // 50)):
+            for name, page, args, reference, parsers in cases:
+                for parse in parsers:
+                    with timer.time():
+                        result = parse(page, *args, engine=engine)
+                    if result != reference and name not in mismatches:
+                        timer.check(False, f"{engine} parse of {name} gave {result!r}, not {reference!r}")
+                        mismatches.add(name)
+        timer.end()
+        return {"pages": len(cases)}
+
+
+for engine in ENGINES:
+    register_golden(engine)
+
+
+@benchmark("parse", "attack_list_feed")
+async def attack_list_feed(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    page, args = PAGES["attack_list"][1:]
+    reference = AttackListParser.parse_document(page, *args, engine="html.parser")
+    result = None
+    timer.begin()
+    for _ in range(context.n(ITERATIONS)):
+        with timer.time():
+            feed = AttackListFeed()
+            # fed in network sized pieces, like a streamed response
+            for i in range(0, len(page), 4096):
+                feed.feed(page[i : i + 4096])  # noqa: E203
+            result = feed.drain()
+            feed.close()
+            result = (result, feed.eof)
+    timer.check(result == reference, f"feed gave {result!r}, not {reference!r}")
+    return None
+
+
+@benchmark("parse", "attack_list_scan")
+async def attack_list_scan(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    page, args = PAGES["attack_list"][1:]
+    reference = AttackListParser.parse_document(page, *args, engine="html.parser")
+    result = None
+    timer.begin()
+    for _ in range(context.n(ITERATIONS)):
+        with timer.time():
+            result = AttackListParser.parse(page, *args)
+    timer.check(result == reference, f"scan gave {result!r}, not {reference!r}")
+    return {"chars": len(page)}
+
+
+def corpus() -> Dict[str, str]:
+    """Returns attack list pages covering every pagination state, and layouts the scanner must handle or reject."""
+    page = attack_list_page(1, 2)
+    last = attack_list_page(1, 3)
+    start = page.index("<nav>")
+    nav = page[start : page.index("</nav>", start) + len("</nav>")]  # noqa: E203
+    return {
+        "first": attack_list_page(1, 1),
+        "middle": page,
+        "last": last,
+        "empty": attack_list_page(1, 1, attacks=0),
+        "single": attack_list_page(1, 1, attacks=1),
+        "no_pagination": page.replace(nav, ""),
+        "pagination_classes": page.replace('"pagination"', '"pagination pagination-sm"'),
+        "comment": page.replace('<div class="row clearfix">', '<div class="row clearfix"><!-- <div> -->'),
+        "uppercase_tag": page.replace('<div class="col-3', '<DIV class="col-3', 1),
+        "uppercase_attribute": last.replace("aria-disabled=", "ARIA-DISABLED="),
+        "entity": page.replace('data-id="1', 'data-id="&#49;', 1),
+        "single_quotes": page.replace('aria-disabled="false"', "aria-disabled='true'"),
+        "quoted_id": page.replace("<a href=", "<a title=' data-id=\"7\" ' href=", 1),
+        "quoted_bracket": page.replace("<a href=", '<a title="a>b" href=', 1),
+        "duplicate_id": page.replace('data-id="', 'data-id="7" data-id="', 1),
+        "unclosed_item": page.replace(nav, nav.replace("</li>", "", 1)),
+        "no_body": page.replace("profile-attacks-body", "profile-attacks"),
+    }
+
+
+def _swap_case(page: str, rng: random.Random) -> str:
+    names = ("class", "data-id", "aria-disabled", "href", "title", "div", "li", "nav", "ul", "a")
+    name = rng.choice(names)
+
+    def swap(match: Any) -> str:
+        return match.group(0).upper() if rng.random() < 0.5 else match.group(0)
+
+    return re.sub(r"\b%s\b" % name, swap, page)
+
+
+def _requote(page: str, rng: random.Random) -> str:
+
+    def requote(match: Any) -> str:
+        return f"='{match.group(1)}'" if rng.random() < 0.3 else match.group(0)
+
+    return re.sub(r'="([^"\']*)"', requote, page)
+
+
+def _decoy(page: str, rng: random.Random) -> str:
+    decoy = rng.choice(("title=' data-id=\"7\" '", 'title="a>b"', 'data-id="7"', "aria-disabled='true'", "x='>'"))
+    tag = rng.choice(("<a ", "<li ", "<div ", "<ul "))
+    index = rng.randrange(page.count(tag) or 1)
+    parts = page.split(tag)
+    if len(parts) > index + 1:
+        parts[index + 1] = decoy + " " + parts[index + 1]
+    return tag.join(parts)
+
+
+def _reference(page: str, rng: random.Random) -> str:
+    return page.replace('="1', '="&#49;', 1) if rng.random() < 0.5 else page.replace("true", "t&#114;ue")
+
+
+def _markup(page: str, rng: random.Random) -> str:
+    body = page.index("profile-attacks-body")
+    end = page.find("</nav>", body)
+    index = rng.randrange(body, end if end != -1 else len(page))
+    insert = rng.choice(("<!-- <div> -->", "<span>", "</div>", "</li>", "<li>", "<div>", " ", "\n", "<br/>"))
+    return page[:index] + insert + page[index:]
+
+
+MUTATIONS = (_swap_case, _requote, _decoy, _reference, _markup)
+
+
+def fuzz(count: int, seed: int = 0) -> Dict[str, str]:
+    """Returns attack list pages with random mutations of their markup."""
+    rng = random.Random(seed)
+    bases = (attack_list_page(1, 1), attack_list_page(1, 3), attack_list_page(1, 1, attacks=1))
+    pages = {}
+    for i in range(count):
+        page = rng.choice(bases)
+        for mutation in rng.sample(MUTATIONS, rng.randint(1, 3)):
+            page = mutation(page, rng)
+        pages[f"fuzz{i}"] = page
+    return pages
+
+
+def parse_reference(page: str, engine: Any = "html.parser") -> Any:
+    """Parses an attack list page in full, returning the type of the error raised if it can't be."""
+    try:
+        return AttackListParser.parse_document(page, "user1", 2, engine=engine)
+    except Exception as e:
+        return type(e)
+
+
+@benchmark("parse", "attack_list_corpus")
+async def attack_list_corpus(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+    pages = {**corpus(), **fuzz(context.n(300))}
+    references = {name: parse_reference(page) for name, page in pages.items()}
+
+    fallbacks, mismatches = set(), set()
+    timer.begin()
+    for _ in range(context.n(ITERATIONS // 100)):
+        for name, page in pages.items():
+            with timer.time():
+                scanned = AttackListParser.scan(page)
+            if scanned is None:
+                fallbacks.add(name)
+            elif scanned != references[name] and name not in mismatches:
+                timer.check(False, f"scan of {name} gave {scanned!r}, not {references[name]!r}")
+                mismatches.add(name)
+    timer.end()
+    return {"pages": len(pages), "fallbacks": len(fallbacks)}
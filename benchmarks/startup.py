@@ -0,0 +1,74 @@
+"""Measures the cost of importing the package in a fresh interpreter, with `-X importtime`."""
+
+from __future__ import annotations
+
+import functools
+import os
+import subprocess
+import sys
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from benchmarks.harness import Context, Timer, benchmark
+
+# The dependencies which should only be imported once they are needed.
+HEAVY = ("aiohttp", "bs4", "lxml", "numpy", "pyarrow")
+
+
+def _run(statement: str) -> List[Tuple[int, str, int]]:
+    """Runs a statement in a new interpreter, returning the depth, name and cumulative microseconds of each import."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, sys.path)))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+        env=env,
+    )
+
+    # import time: self [us] | cumulative | imported package, nested imports are indented further
+    result = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        result.append((depth, name.strip(), int(cumulative)))
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def _startup() -> FrozenSet[str]:
+    """Returns the modules imported by the interpreter itself before running any code."""
+    return frozenset(name for _, name, _ in _run("pass"))
+
+
+def importtime(statement: str) -> Tuple[float, List[str]]:
+    """Runs a statement in a new interpreter, returning the seconds it spent importing and the modules it imported."""
+    startup = _startup()
+    imports = [(depth, name, us) for depth, name, us in _run(statement) if name not in startup]
+    seconds = sum(us for depth, _, us in imports if depth == 0) / 1_000_000
+    return seconds, [name for _, name, _ in imports]
+
+
+def register(name: str, statement: str, light: bool = False) -> None:
+    """Registers a benchmark of a statement, which must not import any of `HEAVY` when `light`."""
+
+    @benchmark("startup", name)
+    async def run(context: Context, timer: Timer) -> Optional[Dict[str, Any]]:
+        modules: List[str] = []
+        for _ in range(context.n(20)):
+            seconds, modules = importtime(statement)
+            timer.record(seconds)
+        timer.end()
+        loaded = {m.split(".", 1)[0] for m in modules}
+        heavy = ",".join(h for h in HEAVY if h in loaded)
+        if light:
+            timer.check(not heavy, f"{statement!r} imported {heavy}")
+        return {"modules": len(modules), "heavy": heavy or "-"}
+
+
+register("import", "import artfight", light=True)
+register("import[errors]", "from artfight import ArtfightError, HTTPError", light=True)
+register("import[metrics]", "from artfight import Metrics", light=True)
+register("import[client]", "from artfight import ArtfightClient")
+register("import[all]", "from artfight import *")
@@ -0,0 +1,333 @@
+"""A local stand-in for artfight.net, serving the recorded fixtures.
+
+The stub hosts `users` users named "user0", "user1", ... each of whom has made `attacks` attacks.
+Attack ids encode their attacker, `id = user * ATTACK_STRIDE + n` for n in 1..attacks,
+and each attack is on another user, forming a graph which can be crawled.
+
+Run it on its own with `python -m benchmarks.stub --port 8080`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import itertools
+import multiprocessing
+import os
+import random
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from aiohttp import web
+
+__all__ = (
+    "StubOptions",
+    "StubServer",
+    "StubProcess",
+    "fixture",
+    "profile_page",
+    "attack_page",
+    "attack_list_page",
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+SESSION_COOKIE = "laravel_session"
+ATTACK_STRIDE = 100_000
+PER_PAGE = 30
+
+_TOKEN = re.compile(r"\{\{(\w+)\}\}")
+
+
+@functools.lru_cache(maxsize=None)
+def fixture(name: str) -> str:
+    """Returns the contents of a fixture."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def render(template: str, **values: Any) -> str:
+    """Replaces the `{{name}}` tokens of a fixture with the provided values."""
+    return _TOKEN.sub(lambda match: str(values[match.group(1)]), template)
+
+
+def profile_page(name: str) -> str:
+    """Renders the profile of a user."""
+    return render(fixture("profile.html"), name=name)
+
+
+def attack_page(id: int, users: int = 1000) -> str:
+    """Renders an attack, attackers attack the users following them."""
+    user, n = divmod(id, ATTACK_STRIDE)
+    defender = (user * 7 + n) % users
+    return render(fixture("attack.html"), id=id, attacker=f"user{user}", defender=f"user{defender}")
+
+
+def attack_list_page(user: int, page: int, attacks: int = 90) -> str:
+    """Renders a page of the attacks made by a user, newest first like the real site."""
+    top = attacks - (page - 1) * PER_PAGE
+    numbers = range(top, max(top - PER_PAGE, 0), -1)
+    cards = "".join(render(fixture("card.html"), id=user * ATTACK_STRIDE + n) for n in numbers)
+    return render(
+        fixture("attacks.html"),
+        name=f"user{user}",
+        cards=cards,
+        page=page,
+        previous=max(page - 1, 1),
+        next=page + 1,
+        last="true" if top - PER_PAGE <= 0 else "false",
+    )
+
+
+class StubOptions:
+    """Configures the stub server.
+
+    Parameters
+    ----------
+    users : int, optional
+        The number of users, by default 1000.
+    attacks : int, optional
+        The number of attacks made by each user, by default 90, three pages.
+    latency : float, optional
+        The number of seconds to wait before responding, by default 0.
+    error_rate : float, optional
+        The probability of responding 503 to a page request, by default 0.
+    session_requests : int, optional
+        The number of requests each session lasts before expiring, by default sessions never expire.
+    chunk_delay : float, optional
+        The number of seconds between each 4KiB chunk of a body, by default bodies are sent at once.
+    seed : int, optional
+        The seed of injected errors, by default 0.
+    """
+
+    def __init__(
+        self,
+        users: int = 1000,
+        attacks: int = 90,
+        latency: float = 0,
+        error_rate: float = 0,
+        session_requests: Optional[int] = None,
+        chunk_delay: float = 0,
+        seed: int = 0,
+    ) -> None:
+        self.users: int = users
+        self.attacks: int = attacks
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.session_requests: Optional[int] = session_requests
+        self.chunk_delay: float = chunk_delay
+        self.seed: int = seed
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.key()}>"
+
+    def key(self) -> Tuple[Any, ...]:
+        return tuple(sorted(vars(self).items()))
+
+
+class StubServer:
+    """Serves the routes of artfight.net used by the client.
+
+    Parameters
+    ----------
+    options : StubOptions, optional
+        The configuration of the server, by default `StubOptions()`.
+    """
+
+    def __init__(self, options: Optional[StubOptions] = None) -> None:
+        self.options: StubOptions = options or StubOptions()
+        self._random = random.Random(self.options.seed)
+        self._tokens = itertools.count(1)
+        self._sessions: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.requests: int = 0
+        self.logins: int = 0
+        self.errors: int = 0
+        self.expired: int = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/login", self.login)
+        app.router.add_get("/~{name}/attacks", self.attacks)
+        app.router.add_get("/~{name}", self.profile)
+        app.router.add_get("/attack/{id}", self.attack)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts serving, returning the base url."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore
+        return f"http://{host}:{port}/"
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _user(self, name: str) -> Optional[int]:
+        if not name.startswith("user") or not name[4:].isdigit():
+            return None
+        index = int(name[4:])
+        return index if index < self.options.users else None
+
+    async def _check(self, request: web.Request) -> Optional[web.Response]:
+        """Applies latency, errors and authentication, returning the response to send instead, if any."""
+        self.requests += 1
+        if self.options.latency:
+            await asyncio.sleep(self.options.latency)
+
+        token = request.cookies.get(SESSION_COOKIE)
+        remaining = self._sessions.get(token) if token is not None else None
+        if remaining is None:
+            return web.Response(status=302, headers={"Location": "/login"})
+        if remaining == 0:
+            del self._sessions[token]  # type: ignore
+            self.expired += 1
+            return web.Response(status=302, headers={"Location": "/login"})
+        if remaining > 0:
+            self._sessions[token] = remaining - 1  # type: ignore
+
+        if self.options.error_rate and self._random.random() < self.options.error_rate:
+            self.errors += 1
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        return None
+
+    async def _send(self, request: web.Request, body: str) -> web.StreamResponse:
+        if not self.options.chunk_delay:
+            return web.Response(text=body, content_type="text/html")
+        data = body.encode()
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        await response.prepare(request)
+        for i in range(0, len(data), 4096):
+            await response.write(data[i : i + 4096])  # noqa: E203
+            await asyncio.sleep(self.options.chunk_delay)
+        await response.write_eof()
+        return response
+
+    async def login(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.options.latency:
+            await asyncio.sleep(self.options.latency)
+        form = await request.post()
+        if not form.get("username") or not form.get("password"):
+            return web.Response(status=302, headers={"Location": "/login"})
+
+        self.logins += 1
+        token = f"session{next(self._tokens)}"
+        lifetime = self.options.session_requests
+        self._sessions[token] = -1 if lifetime is None else lifetime  # negative sessions never expire
+        response = web.Response(status=302, headers={"Location": "/"})
+        response.set_cookie(SESSION_COOKIE, token)
+        return response
+
+    async def profile(self, request: web.Request) -> web.StreamResponse:
+        failure = await self._check(request)
+        if failure is not None:
+            return failure
+        name = request.match_info["name"]
+        if self._user(name) is None:
+            return web.Response(status=404)
+        return await self._send(request, profile_page(name))
+
+    async def attacks(self, request: web.Request) -> web.StreamResponse:
+        failure = await self._check(request)
+        if failure is not None:
+            return failure
+        name = request.match_info["name"]
+        user = self._user(name)
+        if user is None:
+            return web.Response(status=404)
+
+        page = int(request.query.get("page", 1))
+        return await self._send(request, attack_list_page(user, page, self.options.attacks))
+
+    async def attack(self, request: web.Request) -> web.StreamResponse:
+        failure = await self._check(request)
+        if failure is not None:
+            return failure
+        id = int(request.match_info["id"])
+        user, n = divmod(id, ATTACK_STRIDE)
+        if user >= self.options.users or not 0 < n <= self.options.attacks:
+            return web.Response(status=404)
+        return await self._send(request, attack_page(id, self.options.users))
+
+
+def _serve(options: StubOptions, port: int, ready: Any) -> None:
+    async def main() -> None:
+        server = StubServer(options)
+        ready.put(await server.start(port=port))
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class StubProcess:
+    """Runs a `StubServer` in a separate process, so it doesn't compete with the client's event loop.
+
+    Parameters
+    ----------
+    options : StubOptions, optional
+        The configuration of the server, by default `StubOptions()`.
+    port : int, optional
+        The port to listen on, by default any free port.
+    """
+
+    def __init__(self, options: Optional[StubOptions] = None, port: int = 0) -> None:
+        self.options: StubOptions = options or StubOptions()
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self._process = context.Process(target=_serve, args=(self.options, port, ready), daemon=True)
+        self._process.start()
+        self.base_url: str = ready.get(timeout=30)
+
+    def __enter__(self) -> StubProcess:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._process.terminate()
+        self._process.join()
+
+
+def main() -> None:
+    formatter = argparse.RawDescriptionHelpFormatter
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=formatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--attacks", type=int, default=90, help="attacks made by each user")
+    parser.add_argument("--latency", type=float, default=0, help="seconds before each response")
+    parser.add_argument("--error-rate", type=float, default=0, help="probability of a 503")
+    parser.add_argument("--session-requests", type=int, default=None, help="requests before a session expires")
+    parser.add_argument("--chunk-delay", type=float, default=0, help="seconds between 4KiB chunks")
+    args = parser.parse_args()
+
+    options = StubOptions(
+        users=args.users,
+        attacks=args.attacks,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        session_requests=args.session_requests,
+        chunk_delay=args.chunk_delay,
+    )
+
+    async def serve() -> None:
+        server = StubServer(options)
+        print(f"Serving {options!r} on {await server.start(args.host, args.port)}", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 __all__ = (
     "ArtfightClient",
+    "SyncArtfightClient",
     "Attack",
     "PartialAttack",
     "PartialUser",
@@ -10,10 +11,84 @@ __all__ = (
     "HTTPError",
     "LoginError",
     "ParseError",
+    "ParseExecutor",
+    "ResponseCache",
+    "ObjectStore",
+    "Priority",
+    "RequestScheduler",
+    "RetryPolicy",
+    "ConnectionOptions",
+    "Crawler",
+    "AttackExporter",
+    "AttackAggregator",
+    "Metrics",
 )
 __repo__ = r"https://github.com/NimajnebEC/artfight-api"
 __version__ = "0.1.2"
 
-from artfight.client import ArtfightClient
-from artfight.error import ArtfightError, HTTPError, LoginError, ParseError
-from artfight.object import Attack, PartialAttack, PartialUser, User
+import importlib as _importlib
+import typing as _typing
+
+# dependency free, and `artfight.error.X` has always been reachable from the package
+from artfight import error  # noqa: F401
+
+# The module defining each exported name, imported on first access so `import artfight` stays cheap.
+_EXPORTS: _typing.Dict[str, str] = {
+    "ArtfightClient": "artfight.client",
+    "SyncArtfightClient": "artfight.sync",
+    "Attack": "artfight.object",
+    "PartialAttack": "artfight.object",
+    "PartialUser": "artfight.object",
+    "User": "artfight.object",
+    "ArtfightError": "artfight.error",
+    "HTTPError": "artfight.error",
+    "LoginError": "artfight.error",
+    "ParseError": "artfight.error",
+    "ParseExecutor": "artfight.executor",
+    "ResponseCache": "artfight.cache",
+    "ObjectStore": "artfight.store",
+    "Priority": "artfight.scheduler",
+    "RequestScheduler": "artfight.scheduler",
+    "RetryPolicy": "artfight.retry",
+    "ConnectionOptions": "artfight.http",
+    "Crawler": "artfight.crawl",
+    "AttackExporter": "artfight.export",
+    "AttackAggregator": "artfight.aggregate",
+    "Metrics": "artfight.metrics",
+}
+
+
+def __getattr__(name: str) -> _typing.Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        # submodules such as `artfight.client`, which importing the package used to load
+        try:
+            return _importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> _typing.List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if _typing.TYPE_CHECKING:
+    from artfight.aggregate import AttackAggregator
+    from artfight.cache import ResponseCache
+    from artfight.client import ArtfightClient
+    from artfight.crawl import Crawler
+    from artfight.error import ArtfightError, HTTPError, LoginError, ParseError
+    from artfight.executor import ParseExecutor
+    from artfight.export import AttackExporter
+    from artfight.http import ConnectionOptions
+    from artfight.metrics import Metrics
+    from artfight.object import Attack, PartialAttack, PartialUser, User
+    from artfight.retry import RetryPolicy
+    from artfight.scheduler import Priority, RequestScheduler
+    from artfight.store import ObjectStore
+    from artfight.sync import SyncArtfightClient
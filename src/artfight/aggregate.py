@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import importlib.util
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence
+
+from artfight.export import DICTIONARY_COLUMNS, AttackColumns
+
+if TYPE_CHECKING:
+    from artfight.object.attack import Attack
+
+__all__ = ("AttackAggregator",)
+
+EPOCH_DATE = date(1970, 1, 1)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+# The columns reduced by the aggregator.
+AGGREGATED_COLUMNS = ("points", "day_submitted", "team", "attacker", "defender")
+
+
+class AttackAggregator:
+    """Incrementally computes point and attack totals over a stream of attacks.
+
+    Attacks are buffered into columns and reduced a batch at a time with grouped sums over their
+    dictionary codes, using NumPy when it is installed and plain Python otherwise.
+    Totals can be read at any point, which reduces whatever is buffered first.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        The number of attacks buffered before they are reduced, by default 65536.
+    numpy : bool, optional
+        Wether to reduce batches with NumPy, by default if it is installed.
+    """
+
+    def __init__(self, batch_size: int = 65536, numpy: Optional[bool] = None) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if numpy is None:
+            numpy = importlib.util.find_spec("numpy") is not None
+        self._np: Any = None
+        if numpy:
+            import numpy as np
+
+            self._np = np
+
+        self._batch: AttackColumns = AttackColumns()
+        self._batch_size: int = batch_size
+        self._team_points: Sequence[float] = []
+        self._team_attacks: Sequence[int] = []
+        self._user_points: Sequence[float] = []
+        self._user_attacks: Sequence[int] = []
+        self._user_defenses: Sequence[int] = []
+        self._daily: Dict[int, Sequence[float]] = {}
+        self.count: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} count={self.count} numpy={self._np is not None}>"
+
+    def add(self, attack: Attack) -> None:
+        """Adds a fetched attack to the totals.
+
+        Parameters
+        ----------
+        attack : Attack
+            The attack to add.
+        """
+        self.add_parsed(attack.id, attack._data)
+
+    def add_parsed(self, id: int, parsed: Mapping[str, Any]) -> None:
+        """Adds an attack to the totals from its parser output.
+
+        Parameters
+        ----------
+        id : int
+            The id of the attack.
+        parsed : Mapping[str, Any]
+            The output of `AttackParser.parse`.
+        """
+        self._batch.append(id, parsed)
+        self.count += 1
+        if self.count % self._batch_size == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        """Reduces the buffered attacks into the totals."""
+        if len(self._batch) == 0:
+            return
+        columns = {name: self._batch.column(name) for name in AGGREGATED_COLUMNS}
+        self._batch.clear()
+        if self._np is not None:
+            frombuffer = self._np.frombuffer
+            self._reduce_numpy({name: frombuffer(v, v.typecode) for name, v in columns.items()})
+        else:
+            self._reduce_python(columns)
+
+    def add_columns(self, columns: Mapping[str, Any]) -> None:
+        """Adds a batch of attacks which are already in columnar form, such as the output of `read_npz`.
+
+        Parameters
+        ----------
+        columns : Mapping[str, Any]
+            The "points" and "date_submitted" columns, along with the codes of the "team", "attacker"
+            and "defender" columns and their values under "<column>.dictionary".
+            Dates are either `datetime64` values or microseconds since the unix epoch.
+
+        Raises
+        ------
+        ValueError
+            Raised when the aggregator is not using NumPy.
+        """
+        np = self._np
+        if np is None:
+            raise ValueError("Adding columns requires NumPy")
+        self.flush()
+
+        batch: Dict[str, Any] = {"points": np.asarray(columns["points"], dtype=np.float64)}
+        for name in DICTIONARY_COLUMNS:
+            if name in AGGREGATED_COLUMNS:
+                # translate the batch's codes into the aggregator's codes
+                values = np.asarray(columns[f"{name}.dictionary"]).tolist()
+                codes = self._batch.dictionaries[name].encode_all(values)
+                batch[name] = np.frombuffer(codes, dtype=np.int32)[np.asarray(columns[name])]
+
+        dates = np.asarray(columns["date_submitted"])
+        if dates.dtype.kind == "M":
+            batch["day_submitted"] = dates.astype("datetime64[D]").astype(np.int64)
+        else:
+            batch["day_submitted"] = dates // MICROSECONDS_PER_DAY
+
+        self.count += len(batch["points"])
+        self._reduce_numpy(batch)
+
+    def _reduce_numpy(self, columns: Dict[str, Any]) -> None:
+        np = self._np
+        teams = len(self._batch.dictionaries["team"])
+        users = len(self._batch.dictionaries["attacker"]), len(self._batch.dictionaries["defender"])
+        points, team = columns["points"], columns["team"]
+        attacker, defender = columns["attacker"], columns["defender"]
+
+        def accumulate(total: Any, increment: Any) -> Any:
+            if len(total) == 0:
+                return increment
+            if len(total) < len(increment):
+                total = np.concatenate((total, np.zeros(len(increment) - len(total), increment.dtype)))
+            return total + increment
+
+        self._team_points = accumulate(self._team_points, np.bincount(team, points, teams))
+        self._team_attacks = accumulate(self._team_attacks, np.bincount(team, None, teams))
+        self._user_points = accumulate(self._user_points, np.bincount(attacker, points, users[0]))
+        self._user_attacks = accumulate(self._user_attacks, np.bincount(attacker, None, users[0]))
+        self._user_defenses = accumulate(self._user_defenses, np.bincount(defender, None, users[1]))
+
+        # reduce every day at once, then add each day's row to its running totals
+        unique, day = np.unique(columns["day_submitted"], return_inverse=True)
+        daily = np.bincount(day.reshape(-1) * teams + team, points, len(unique) * teams)
+        for i, row in zip(unique.tolist(), daily.reshape(len(unique), teams)):
+            self._daily[i] = accumulate(self._daily.get(i, ()), row)
+
+    def _reduce_python(self, columns: Dict[str, Any]) -> None:
+        def accumulate(
+            total: Sequence[Any],
+            codes: Sequence[int],
+            weights: Optional[Sequence[float]],
+        ) -> List[Any]:
+            result = list(total)
+            if codes:
+                result.extend([0] * (max(codes) + 1 - len(result)))
+            if weights is None:
+                for code in codes:
+                    result[code] += 1
+            else:
+                for code, weight in zip(codes, weights):
+                    result[code] += weight
+            return result
+
+        points, team = columns["points"], columns["team"]
+        self._team_points = accumulate(self._team_points, team, points)
+        self._team_attacks = accumulate(self._team_attacks, team, None)
+        self._user_points = accumulate(self._user_points, columns["attacker"], points)
+        self._user_attacks = accumulate(self._user_attacks, columns["attacker"], None)
+        self._user_defenses = accumulate(self._user_defenses, columns["defender"], None)
+
+        days: Dict[int, List[int]] = {}
+        for i, day in enumerate(columns["day_submitted"]):
+            days.setdefault(day, []).append(i)
+        for day, rows in days.items():
+            codes = [team[i] for i in rows]
+            self._daily[day] = accumulate(self._daily.get(day, []), codes, [points[i] for i in rows])
+
+    def _totals(self, column: str, totals: str) -> Dict[str, Any]:
+        self.flush()
+        return dict(zip(self._batch.dictionaries[column].values, getattr(self, totals)))
+
+    def team_points(self) -> Dict[str, float]:
+        """The total points of each team."""
+        return {k: float(v) for k, v in self._totals("team", "_team_points").items()}
+
+    def team_attacks(self) -> Dict[str, int]:
+        """The number of attacks made by each team."""
+        return {k: int(v) for k, v in self._totals("team", "_team_attacks").items()}
+
+    def user_points(self) -> Dict[str, float]:
+        """The total points of each attacker, keyed by username."""
+        return {k: float(v) for k, v in self._totals("attacker", "_user_points").items()}
+
+    def user_attacks(self) -> Dict[str, int]:
+        """The number of attacks made by each attacker, keyed by username."""
+        return {k: int(v) for k, v in self._totals("attacker", "_user_attacks").items()}
+
+    def user_defenses(self) -> Dict[str, int]:
+        """The number of attacks recieved by each defender, keyed by username."""
+        return {k: int(v) for k, v in self._totals("defender", "_user_defenses").items()}
+
+    def daily_team_points(self) -> Dict[date, Dict[str, float]]:
+        """The points of each team per day submitted, ordered by day."""
+        self.flush()
+        teams = self._batch.dictionaries["team"].values
+        result: Dict[date, Dict[str, float]] = {}
+        for day, totals in sorted(self._daily.items()):
+            points = {k: float(v) for k, v in zip(teams, totals) if v}
+            result[EPOCH_DATE + timedelta(days=day)] = points
+        return result
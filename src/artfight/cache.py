@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+from artfight.util import Method
+
+__all__ = ("ResponseCache", "DEFAULT_ROUTE_TTLS")
+
+# Attacks are effectively immutable once submitted, profiles change most often.
+DEFAULT_ROUTE_TTLS: Dict[str, Optional[float]] = {
+    "/~*/attacks*": 600,
+    "/~*": 300,
+    "/attack/*": 86400,
+}
+
+
+class CacheEntry:
+    """A cached response body along with its validators."""
+
+    __slots__ = ("body", "expires", "etag", "last_modified")
+
+    def __init__(
+        self,
+        body: str,
+        expires: Optional[float],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self.last_modified: Optional[str] = last_modified
+        self.expires: Optional[float] = expires
+        self.etag: Optional[str] = etag
+        self.body: str = body
+
+    @property
+    def fresh(self) -> bool:
+        """Wether the entry can be used without revalidating it."""
+        return self.expires is None or self.expires > time.monotonic()
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """The conditional request headers that revalidate this entry."""
+        headers: Dict[str, str] = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """An in-memory LRU cache of successful GET responses.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of responses to keep, by default 1024.
+    ttl : float, optional
+        The number of seconds responses for routes without a specific ttl stay fresh, by default 60.
+    routes : Mapping[str, Optional[float]], optional
+        Fresh-for times in seconds keyed by `fnmatch` route patterns, by default `DEFAULT_ROUTE_TTLS`.
+        The first matching pattern is used, a ttl of `None` never expires and a ttl of 0 disables caching.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60,
+        routes: Optional[Mapping[str, Optional[float]]] = None,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self._entries: OrderedDict[Tuple[str, str], CacheEntry] = OrderedDict()
+        if routes is None:
+            routes = DEFAULT_ROUTE_TTLS
+        self._routes: Mapping[str, Optional[float]] = routes
+        self._maxsize: int = maxsize
+        self._ttl: float = ttl
+        self.revalidations: int = 0
+        self.evictions: int = 0
+        self.misses: int = 0
+        self.hits: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} size={len(self)} hits={self.hits} misses={self.misses}>"
+
+    def ttl(self, route: str) -> Optional[float]:
+        """Returns the number of seconds responses for the provided route stay fresh.
+
+        Parameters
+        ----------
+        route : str
+            The route relative to the base url.
+
+        Returns
+        -------
+        Optional[float]
+            The ttl in seconds, or `None` if responses never expire.
+        """
+        if not route.startswith("/"):
+            route = "/" + route
+        for pattern, ttl in self._routes.items():
+            if fnmatch.fnmatchcase(route, pattern):
+                return ttl
+        return self._ttl
+
+    def get(self, method: Method, url: str) -> Union[CacheEntry, None]:
+        """Looks up the cached response for a request, counting a hit or a miss.
+
+        Stale entries are still returned when they can be revalidated.
+
+        Parameters
+        ----------
+        method : Method
+            The method of the request.
+        url : str
+            The full url of the request.
+
+        Returns
+        -------
+        Union[CacheEntry, None]
+            The cached entry, or `None` if there isn't a usable one.
+        """
+        key = (method, url)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fresh:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if not entry.validators:
+                del self._entries[key]
+                entry = None
+        self.misses += 1
+        return entry
+
+    def put(
+        self,
+        method: Method,
+        url: str,
+        route: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Stores a response, evicting the least recently used entries if full.
+
+        Parameters
+        ----------
+        method : Method
+            The method of the request.
+        url : str
+            The full url of the request.
+        route : str
+            The route of the request, used to determine the ttl.
+        body : str
+            The body of the response.
+        etag : str, optional
+            The response's `ETag` header, by default None.
+        last_modified : str, optional
+            The response's `Last-Modified` header, by default None.
+        """
+        ttl = self.ttl(route)
+        if ttl is not None and ttl <= 0:
+            return
+
+        expires = None if ttl is None else time.monotonic() + ttl
+        self._entries[(method, url)] = CacheEntry(body, expires, etag, last_modified)
+        self._entries.move_to_end((method, url))
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def revalidated(self, method: Method, url: str, route: str) -> Union[CacheEntry, None]:
+        """Marks a stale entry as fresh again after the server replied 304.
+
+        Parameters
+        ----------
+        method : Method
+            The method of the request.
+        url : str
+            The full url of the request.
+        route : str
+            The route of the request, used to determine the ttl.
+
+        Returns
+        -------
+        Union[CacheEntry, None]
+            The revalidated entry, or `None` if it has since been evicted.
+        """
+        entry = self._entries.get((method, url))
+        if entry is None:
+            return None
+        ttl = self.ttl(route)
+        entry.expires = None if ttl is None else time.monotonic() + ttl
+        self._entries.move_to_end((method, url))
+        self.revalidations += 1
+        return entry
+
+    def clear(self) -> None:
+        """Removes all cached responses."""
+        self._entries.clear()
@@ -1,15 +1,54 @@
 from __future__ import annotations
 
-from artfight.http import HTTPClient
+import asyncio
+from typing import Any, AsyncIterator, Iterable, Optional, Tuple, TypeVar, Union
+
+import aiohttp
+
+from artfight import error
+from artfight.cache import ResponseCache
+from artfight.crawl import Crawler
+from artfight.engine import ParserEngine
+from artfight.executor import ExecutorMode, ParseExecutor
+from artfight.http import BASE_URL, ConnectionOptions, HTTPClient
+from artfight.metrics import Metrics
 from artfight.object import Attack, PartialAttack, PartialUser, User
+from artfight.object.abc import ArtfightObject
+from artfight.parser import BaseParser
+from artfight.retry import RetryPolicy
+from artfight.scheduler import RequestScheduler
+from artfight.store import ObjectStore
+from artfight.util import windowed
 
 __all__ = ("ArtfightClient",)
 
+K = TypeVar("K")
+F = TypeVar("F", bound=ArtfightObject)
+
+# Errors which only affect a single item of a batch.
+BATCH_ERRORS = (error.ArtfightError, aiohttp.ClientError, asyncio.TimeoutError)
+
 
 class ArtfightClient:
     """Represents a connection to Artfight."""
 
-    def __init__(self, username: str, password: str) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        *,
+        parse_executor: Union[ExecutorMode, ParseExecutor] = "inline",
+        parse_engine: Optional[ParserEngine] = None,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[ObjectStore] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        retry: Optional[RetryPolicy] = None,
+        connection: Optional[ConnectionOptions] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        lazy_fields: bool = False,
+        metrics: Optional[Metrics] = None,
+        base_url: str = BASE_URL,
+    ) -> None:
         """Represents a connection to Artfight.
 
         Parameters
@@ -18,8 +57,53 @@ class ArtfightClient:
             The username to log in with.
         password : str
             The password to log in with.
+        parse_executor : Union[ExecutorMode, ParseExecutor], optional
+            Where fetched pages should be parsed, by default "inline".
+            Either an `ExecutorMode` or a `ParseExecutor` instance, instances are not closed with the client.
+        parse_engine : ParserEngine, optional
+            The engine used to build document trees, by default lxml if installed, otherwise html.parser.
+        cache : ResponseCache, optional
+            The cache to store fetched pages in, by default pages are always refetched.
+        store : ObjectStore, optional
+            The store to persist fetched users and attacks in, stores are not closed with the client.
+        scheduler : RequestScheduler, optional
+            The scheduler limiting the rate and concurrency of requests, by default requests are not limited.
+        retry : RetryPolicy, optional
+            The policy deciding how failed requests are retried, by default `RetryPolicy()`.
+        connection : ConnectionOptions, optional
+            The connection pool size, keepalive, dns caching and timeouts, by default `ConnectionOptions()`.
+        session : aiohttp.ClientSession, optional
+            A shared session to send requests with, it is not closed with the client.
+            When provided, `connection` is ignored.
+        lazy_fields : bool, optional
+            Wether fetched users and attacks should parse each field when it is first accessed,
+            instead of parsing every field up front, by default False.
+            Ignored when there is a `store` to fill or when parsing on a process pool.
+        metrics : Metrics, optional
+            The metrics to record request phases, retries, logins and parsing in, by default nothing is recorded.
+            Request phases are not recorded on a shared `session` unless it was created with `Metrics.trace_config`.
+        base_url : str, optional
+            The url of the artfight website, by default "https://artfight.net/".
+            Useful for pointing the client at a mirror or a local stub server.
         """
-        self.http: HTTPClient = HTTPClient(username, password)
+        self._owns_executor: bool = not isinstance(parse_executor, ParseExecutor)
+        if not isinstance(parse_executor, ParseExecutor):
+            parse_executor = ParseExecutor(parse_executor)
+        self.http: HTTPClient = HTTPClient(
+            username,
+            password,
+            parse_executor=parse_executor,
+            parse_engine=parse_engine,
+            cache=cache,
+            store=store,
+            scheduler=scheduler,
+            retry=retry,
+            connection=connection,
+            session=session,
+            lazy_fields=lazy_fields,
+            metrics=metrics,
+            base_url=base_url,
+        )
 
     async def __aenter__(self) -> ArtfightClient:
         return self
@@ -28,12 +112,16 @@ class ArtfightClient:
         await self.close()
 
     async def close(self) -> None:
-        """Close the client's HTTP connection if it exists."""
+        """Close the client's HTTP connection and parse executor if they exist."""
         await self.http.close()
+        if self._owns_executor:
+            self.http.parse_executor.close()
 
     def get_user(self, name: str) -> PartialUser:
         """Returns a `PartialUser` instance from their username.
 
+        The same instance is returned for a username for as long as it is referenced.
+
         Parameters
         ----------
         name : str
@@ -44,11 +132,13 @@ class ArtfightClient:
         PartialUser
             A `PartialUser` instance representing the user.
         """
-        return PartialUser(name, self.http)
+        return PartialUser.intern(name, self.http)
 
     async def fetch_user(self, name: str) -> User:
         """Fetches an up-to-date instance of a user.
 
+        Refetching a user updates the instance returned by previous fetches in place.
+
         Parameters
         ----------
         name : str
@@ -64,6 +154,8 @@ class ArtfightClient:
     def get_attack(self, id: int) -> PartialAttack:
         """Returns a `PartialAttack` instance from its id.
 
+        The same instance is returned for an id for as long as it is referenced.
+
         Parameters
         ----------
         id : int
@@ -74,11 +166,13 @@ class ArtfightClient:
         PartialAttack
            A `PartialAttack` instance representing the attack.
         """
-        return PartialAttack(id, self.http)
+        return PartialAttack.intern(id, self.http)
 
     async def fetch_attack(self, id: int) -> Attack:
         """Fetches an up-to-date instance of an Attack.
 
+        Refetching an attack updates the instance returned by previous fetches in place.
+
         Parameters
         ----------
         id : int
@@ -90,3 +184,113 @@ class ArtfightClient:
             An instance of `Attack` representing the fetched attack.
         """
         return await self.get_attack(id).fetch()
+
+    async def fetch_users_many(
+        self,
+        names: Iterable[str],
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> AsyncIterator[Tuple[str, Union[User, Exception]]]:
+        """Fetches up-to-date instances of many users.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            The usernames of the users to fetch, consumed lazily.
+        concurrency : int, optional
+            The maximum number of users fetched at once, by default 8.
+        ordered : bool, optional
+            Wether to yield results in the order of `names` instead of as they complete, by default False.
+
+        Returns
+        -------
+        AsyncIterator[Tuple[str, Union[User, Exception]]]
+            Pairs of each username and either its `User` or the error raised while fetching it,
+            such as `NotFoundError` or `ParseError`.
+
+        Raises
+        ------
+        ValueError
+            Raised when `concurrency` is less than 1.
+        """
+        users = (self.get_user(name) for name in names)
+        parser = PartialUser._PARSER(self.http)
+        async for result in self._fetch_many(users, parser, concurrency, ordered):
+            yield result
+
+    async def fetch_attacks_many(
+        self,
+        ids: Iterable[int],
+        *,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> AsyncIterator[Tuple[int, Union[Attack, Exception]]]:
+        """Fetches up-to-date instances of many attacks.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            The ids of the attacks to fetch, consumed lazily.
+        concurrency : int, optional
+            The maximum number of attacks fetched at once, by default 8.
+        ordered : bool, optional
+            Wether to yield results in the order of `ids` instead of as they complete, by default False.
+
+        Returns
+        -------
+        AsyncIterator[Tuple[int, Union[Attack, Exception]]]
+            Pairs of each attack id and either its `Attack` or the error raised while fetching it,
+            such as `NotFoundError` or `ParseError`.
+
+        Raises
+        ------
+        ValueError
+            Raised when `concurrency` is less than 1.
+        """
+        attacks = (self.get_attack(id) for id in ids)
+        parser = PartialAttack._PARSER(self.http)
+        async for result in self._fetch_many(attacks, parser, concurrency, ordered):
+            yield result
+
+    def crawl(self, seeds: Iterable[str], **options: Any) -> Crawler:
+        """Creates a breadth first crawl of the attack graph from the provided users.
+
+        Parameters
+        ----------
+        seeds : Iterable[str]
+            The usernames to start crawling from.
+        options : Any
+            The options to create the `Crawler` with, such as `max_depth` and `checkpoint`.
+
+        Returns
+        -------
+        Crawler
+            The crawler, iterate over it to run the crawl.
+        """
+        return Crawler(self, seeds, **options)
+
+    async def _fetch_many(
+        self,
+        objects: Iterable[ArtfightObject[K, F]],
+        parser: BaseParser[F],
+        concurrency: int,
+        ordered: bool,
+    ) -> AsyncIterator[Tuple[K, Union[F, Exception]]]:
+        """Fetches many objects with bounded concurrency, sharing a single parser."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        async def fetch(obj: ArtfightObject[K, F]) -> Tuple[K, Union[F, Exception]]:
+            try:
+                return obj.id, await obj.fetch(parser)
+            except BATCH_ERRORS as e:
+                return obj.id, e
+
+        fetches = windowed(map(fetch, objects), concurrency, ordered)
+        try:
+            async for result in fetches:
+                yield result
+        finally:
+            # cancel outstanding fetches as soon as the caller stops iterating
+            await fetches.aclose()
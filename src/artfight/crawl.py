@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import aiohttp
+
+from artfight import error
+from artfight.object import Attack, PartialUser, User
+
+if TYPE_CHECKING:
+    from artfight.client import ArtfightClient
+
+_log = logging.getLogger(__name__)
+
+__all__ = ("Crawler", "CrawlNode", "CrawlEdge", "CrawlError")
+
+CHECKPOINT_VERSION = 1
+
+# A unit of work, either ("user", name, depth) or ("attack", id, depth).
+Job = Tuple[str, Any, int]
+
+
+class CrawlNode:
+    """A user or attack reached by a crawl.
+
+    Attributes
+    ----------
+    kind : str
+        Either "user" or "attack".
+    id : Union[str, int]
+        The username or attack id.
+    depth : int
+        The number of attacks between this node and the nearest seed user.
+    object : Union[PartialUser, User, Attack]
+        The reached object, users are only fetched when the crawl fetches profiles.
+    """
+
+    __slots__ = ("kind", "id", "depth", "object")
+
+    def __init__(self, kind: str, id: Union[str, int], depth: int, object: Any) -> None:
+        self.object: Union[PartialUser, User, Attack] = object
+        self.id: Union[str, int] = id
+        self.depth: int = depth
+        self.kind: str = kind
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} kind={self.kind!r} id={self.id!r} depth={self.depth}>"
+
+
+class CrawlEdge:
+    """An attack from one user on another.
+
+    Attributes
+    ----------
+    attacker : str
+        The username of the user who submitted the attack.
+    defender : str
+        The username of the user the attack was against.
+    attack : int
+        The id of the attack.
+    """
+
+    __slots__ = ("attacker", "defender", "attack")
+
+    def __init__(self, attacker: str, defender: str, attack: int) -> None:
+        self.attacker: str = attacker
+        self.defender: str = defender
+        self.attack: int = attack
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.attacker!r} -> {self.defender!r} attack={self.attack}>"
+
+
+class CrawlError:
+    """A user or attack which could not be fetched, the crawl continues past it.
+
+    Attributes
+    ----------
+    kind : str
+        Either "user" or "attack".
+    id : Union[str, int]
+        The username or attack id.
+    error : Exception
+        The error raised while fetching it.
+    """
+
+    __slots__ = ("kind", "id", "error")
+
+    def __init__(self, kind: str, id: Union[str, int], error: Exception) -> None:
+        self.id: Union[str, int] = id
+        self.error: Exception = error
+        self.kind: str = kind
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} kind={self.kind!r} id={self.id!r} error={self.error!r}>"
+
+
+CrawlEvent = Union[CrawlNode, CrawlEdge, CrawlError]
+
+
+class Crawler:
+    """Expands the attack graph breadth first from a set of seed users.
+
+    Each user's attacks are listed and fetched, then the defenders of those attacks are crawled in turn.
+    Iterating over the crawler runs it, yielding a `CrawlNode` for every user and attack reached,
+    a `CrawlEdge` for every attack and a `CrawlError` for anything which could not be fetched.
+
+    Parameters
+    ----------
+    client : ArtfightClient
+        The client to crawl with.
+    seeds : Iterable[str]
+        The usernames to start crawling from, ignored when resuming from a checkpoint.
+    max_depth : int, optional
+        The maximum depth of users to crawl, seeds have a depth of 0, by default unlimited.
+    max_users : int, optional
+        The maximum number of users to crawl, by default unlimited.
+    max_attacks : int, optional
+        The maximum number of attacks to fetch, by default unlimited.
+    concurrency : int, optional
+        The maximum number of users and attacks fetched at once, by default 8.
+    profiles : bool, optional
+        Wether to fetch the profile of every crawled user, by default False.
+    checkpoint : Union[str, os.PathLike], optional
+        The path of a file to save progress to, by default progress is not saved.
+        If the file already exists the crawl resumes from it.
+        Users and attacks in progress when the crawl was interrupted, including those whose events
+        had not all been taken from the crawler, are crawled again, so their events may be repeated.
+    checkpoint_interval : int, optional
+        The number of users and attacks to complete between saving progress, by default 100.
+    """
+
+    def __init__(
+        self,
+        client: ArtfightClient,
+        seeds: Iterable[str] = (),
+        *,
+        max_depth: Optional[int] = None,
+        max_users: Optional[int] = None,
+        max_attacks: Optional[int] = None,
+        concurrency: int = 8,
+        profiles: bool = False,
+        checkpoint: Optional[Union[str, os.PathLike]] = None,
+        checkpoint_interval: int = 100,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+        self._client: ArtfightClient = client
+        self._seeds: List[str] = list(seeds)
+        self._max_depth: Optional[int] = max_depth
+        self._max_users: Optional[int] = max_users
+        self._max_attacks: Optional[int] = max_attacks
+        self._concurrency: int = concurrency
+        self._profiles: bool = profiles
+        self._checkpoint: Optional[Union[str, os.PathLike]] = checkpoint
+        self._checkpoint_interval: int = checkpoint_interval
+
+        self._counter = itertools.count()
+        self._queue: Union[asyncio.PriorityQueue[Tuple[int, int, Job]], None] = None
+        self._failure: Union[BaseException, None] = None
+        self._pending: Dict[int, Job] = {}
+        self._running: Dict[int, Job] = {}
+        self._users: Set[str] = set()
+        self._attacks: Set[int] = set()
+        self._completed: int = 0
+        self.errors: int = 0
+
+    def __repr__(self) -> str:
+        name = type(self).__name__
+        return f"<{name} users={self.users} attacks={self.attacks} frontier={self.frontier}>"
+
+    @property
+    def frontier(self) -> int:
+        """The number of users and attacks waiting to be crawled."""
+        return len(self._pending) + len(self._running)
+
+    @property
+    def users(self) -> int:
+        """The number of users reached so far."""
+        return len(self._users)
+
+    @property
+    def attacks(self) -> int:
+        """The number of attacks reached so far."""
+        return len(self._attacks)
+
+    def __aiter__(self) -> AsyncIterator[CrawlEvent]:
+        return self._crawl()
+
+    def _push(self, job: Job) -> None:
+        # order by depth, then by discovery, so the crawl is breadth first
+        seq = next(self._counter)
+        self._pending[seq] = job
+        self._queue.put_nowait((job[2], seq, job))  # type: ignore
+
+    def _discover_user(self, name: str, depth: int) -> None:
+        if name in self._users:
+            return
+        if self._max_depth is not None and depth > self._max_depth:
+            return
+        if self._max_users is not None and len(self._users) >= self._max_users:
+            return
+        self._users.add(name)
+        self._push(("user", name, depth))
+
+    def _discover_attack(self, id: int, depth: int) -> bool:
+        if id in self._attacks:
+            return True
+        if self._max_attacks is not None and len(self._attacks) >= self._max_attacks:
+            return False
+        self._attacks.add(id)
+        self._push(("attack", id, depth))
+        return True
+
+    def _load(self) -> bool:
+        """Restores progress from the checkpoint file, returning wether there was one."""
+        if self._checkpoint is None or not os.path.exists(self._checkpoint):
+            return False
+        with open(self._checkpoint, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {state.get('version')!r}")
+        self._users.update(state["users"])
+        self._attacks.update(state["attacks"])
+        for kind, id, depth in state["frontier"]:
+            self._push((kind, id, depth))
+        _log.debug("Resumed crawl with %d jobs in the frontier", self.frontier)
+        return True
+
+    def save(self) -> None:
+        """Saves progress to the checkpoint file, jobs in progress are saved as not yet started."""
+        if self._checkpoint is None:
+            return
+        jobs = {**self._pending, **self._running}
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "users": sorted(self._users),
+            "attacks": sorted(self._attacks),
+            "frontier": [list(jobs[seq]) for seq in sorted(jobs, key=lambda seq: (jobs[seq][2], seq))],
+        }
+
+        # write atomically so an interrupted save never corrupts the checkpoint
+        temp = f"{os.fspath(self._checkpoint)}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(temp, self._checkpoint)
+
+    async def _crawl_user(self, name: str, depth: int, emit: asyncio.Queue[Any]) -> None:
+        user: Union[PartialUser, User] = self._client.get_user(name)
+        if self._profiles:
+            user = await user.fetch()
+        await emit.put(CrawlNode("user", name, depth, user))
+
+        async for attack in user.fetch_attacks():
+            if not self._discover_attack(attack.id, depth):
+                break
+
+    async def _crawl_attack(self, id: int, depth: int, emit: asyncio.Queue[Any]) -> None:
+        attack: Attack = await self._client.get_attack(id).fetch()
+        attacker, defender = attack.attacker.name, attack.defender.name
+        await emit.put(CrawlNode("attack", id, depth, attack))
+        await emit.put(CrawlEdge(attacker, defender, id))
+        self._discover_user(attacker, depth)
+        self._discover_user(defender, depth + 1)
+
+    async def _worker(
+        self,
+        queue: asyncio.PriorityQueue[Tuple[int, int, Job]],
+        emit: asyncio.Queue[Any],
+    ) -> None:
+        while True:
+            _, seq, job = await queue.get()
+            self._running[seq] = self._pending.pop(seq)
+            kind, id, depth = job
+            try:
+                if kind == "user":
+                    await self._crawl_user(id, depth, emit)
+                else:
+                    await self._crawl_attack(id, depth, emit)
+            except (error.ArtfightError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                _log.warning("Failed to crawl %s %r: %r", kind, id, e)
+                self.errors += 1
+                await emit.put(CrawlError(kind, id, e))
+            except Exception as e:
+                # unexpected errors end the crawl, leaving the job in the checkpoint
+                self._failure = e
+                await emit.put(None)
+                return
+
+            # the job only completes once the consumer has taken every event before this marker
+            await emit.put(seq)
+
+    def _complete(self, seq: int) -> None:
+        del self._running[seq]
+        self._queue.task_done()  # type: ignore
+        self._completed += 1
+        if self._completed % self._checkpoint_interval == 0:
+            self.save()
+
+    async def _crawl(self) -> AsyncIterator[CrawlEvent]:
+        queue: asyncio.PriorityQueue[Tuple[int, int, Job]] = asyncio.PriorityQueue()
+        self._queue = queue
+        for seq, job in sorted(self._pending.items(), key=lambda item: (item[1][2], item[0])):
+            queue.put_nowait((job[2], seq, job))
+        # continue an interrupted iteration, otherwise resume from the checkpoint or start from the seeds
+        if not self._users and not self._load():
+            for seed in self._seeds:
+                self._discover_user(seed, 0)
+
+        # bounded so a slow consumer pauses the crawl rather than buffering it,
+        # holding events, the seq of each job after its events, and None once the crawl ends
+        emit: asyncio.Queue[Union[CrawlEvent, int, None]]
+        emit = asyncio.Queue(maxsize=self._concurrency * 16)
+        workers = [asyncio.ensure_future(self._worker(queue, emit)) for _ in range(self._concurrency)]
+
+        async def finish() -> None:
+            await queue.join()
+            await emit.put(None)
+
+        done = asyncio.ensure_future(finish())
+        try:
+            while True:
+                event = await emit.get()
+                if event is None:
+                    break
+                if isinstance(event, int):
+                    self._complete(event)
+                    continue
+                yield event
+            if self._failure is not None:
+                raise self._failure
+        finally:
+            done.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(done, *workers, return_exceptions=True)
+            # jobs interrupted part way through, or whose events weren't all taken, are started again when resumed
+            self._pending.update(self._running)
+            self._running.clear()
+            self._queue = None
+            self.save()
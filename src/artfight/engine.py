@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import Literal, Optional, Union
+
+__all__ = ("ParserEngine", "get_engine")
+
+ParserEngine = Union[Literal["html.parser"], Literal["lxml"]]
+
+
+def get_engine(engine: Optional[ParserEngine] = None) -> ParserEngine:
+    """Resolves the engine parsers should use to build document trees.
+
+    Parameters
+    ----------
+    engine : ParserEngine, optional
+        The engine to use, by default the fastest available engine.
+        - `lxml` uses the C based lxml tree builder, requires the `lxml` extra.
+        - `html.parser` uses the pure Python tree builder from the standard library.
+
+    Returns
+    -------
+    ParserEngine
+        The resolved engine.
+
+    Raises
+    ------
+    ValueError
+        Raised when the requested engine is unknown or not installed.
+    """
+    if engine is None:
+        return "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+    if engine == "lxml" and importlib.util.find_spec("lxml") is None:
+        raise ValueError("The lxml engine requires the lxml package to be installed")
+    if engine not in ("html.parser", "lxml"):
+        raise ValueError(f"Unknown parser engine {engine!r}")
+    return engine
@@ -1,6 +1,9 @@
-from typing import Union
+from __future__ import annotations
 
-from artfight.util import Method
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    from artfight.util import Method
 
 __all__ = (
     "ArtfightError",
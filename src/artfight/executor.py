@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, Optional, TypeVar, Union
+
+__all__ = ("ParseExecutor", "ExecutorMode")
+
+R = TypeVar("R")
+
+ExecutorMode = Union[Literal["inline"], Literal["thread"], Literal["process"]]
+
+
+class ParseExecutor:
+    """Runs parser work either inline on the event loop or on a worker pool.
+
+    Parameters
+    ----------
+    mode : ExecutorMode, optional
+        Where parsing should take place, by default "inline".
+        - `inline` parses directly inside the calling coroutine.
+        - `thread` parses on a `ThreadPoolExecutor`.
+        - `process` parses on a `ProcessPoolExecutor`, side stepping the GIL.
+    max_workers : int, optional
+        The maximum number of workers in the pool, by default chosen by `concurrent.futures`.
+    """
+
+    def __init__(self, mode: ExecutorMode = "inline", max_workers: Optional[int] = None) -> None:
+        if mode not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown executor mode {mode!r}")
+        self._pool: Union[Executor, None] = None
+        self._max_workers: Optional[int] = max_workers
+        self._mode: ExecutorMode = mode
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} mode={self._mode!r}>"
+
+    @property
+    def mode(self) -> ExecutorMode:
+        """Where parsing takes place."""
+        return self._mode
+
+    def _get_pool(self) -> Executor:
+        """Returns the worker pool, creating it if it does not exist yet."""
+        if self._pool is None:
+            if self._mode == "process":
+                self._pool = ProcessPoolExecutor(self._max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(self._max_workers, thread_name_prefix="artfight-parse")
+        return self._pool
+
+    async def run(self, func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """Run the provided function according to the executor's mode.
+
+        When using the `process` mode, the function, its arguments and its result must be picklable.
+
+        Parameters
+        ----------
+        func : Callable[..., R]
+            The function to run.
+        args : tuple[Any]
+            Positional arguments to supply to the function.
+        kwargs : dict[str, Any]
+            Keyword arguments to supply to the function.
+
+        Returns
+        -------
+        R
+            The value returned by the function.
+        """
+        if self._mode == "inline":
+            return func(*args, **kwargs)
+
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), func, *args)
+
+    def close(self) -> None:
+        """Shuts down the worker pool if it exists."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import importlib.util
+import operator
+import os
+from array import array
+from datetime import datetime, timedelta
+from itertools import repeat
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from artfight.object.attack import Attack
+
+__all__ = ("AttackColumns", "AttackExporter", "DictionaryEncoder", "ExportFormat", "read_npz")
+
+ExportFormat = Union[Literal["parquet"], Literal["npz"]]
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MICROSECOND = timedelta(microseconds=1)
+
+# Fixed width columns, keyed by name, with their `array` typecode.
+NUMERIC_COLUMNS: Dict[str, str] = {
+    "id": "q",
+    "points": "d",
+    "date_submitted": "q",
+}
+
+# String columns, dictionary encoded as indices into the values seen so far.
+DICTIONARY_COLUMNS: Tuple[str, ...] = ("team", "type", "attacker", "defender")
+
+COLUMNS: Tuple[str, ...] = (*NUMERIC_COLUMNS, *DICTIONARY_COLUMNS)
+
+_get_fields = operator.itemgetter(*COLUMNS[1:])
+
+
+class _Codes(Dict[str, int]):
+    """Maps values to their codes, assigning the next code to unseen values."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: List[str]) -> None:
+        super().__init__()
+        self.values: List[str] = values
+
+    def __missing__(self, value: str) -> int:
+        code = self[value] = len(self.values)
+        self.values.append(value)
+        return code
+
+
+class DictionaryEncoder:
+    """Encodes strings as indices into a growing list of distinct values."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._codes: _Codes = _Codes(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        """Returns the index of the provided value, adding it if it hasn't been seen before."""
+        return self._codes[value]
+
+    def encode_all(self, values: Iterable[str]) -> array:
+        """Returns the indices of the provided values as an `int32` array, adding unseen values."""
+        return array("i", map(self._codes.__getitem__, values))
+
+
+class AttackColumns:
+    """A batch of attacks to be stored column by column.
+
+    Only the exported fields of each attack are kept, and the columns are built in bulk by `build`.
+    Numeric columns are packed `array`s, `date_submitted` holds microseconds since the unix epoch
+    and the string columns hold `int32` indices into the shared dictionaries,
+    which are kept across calls to `clear` so codes stay stable for the whole export.
+
+    Parameters
+    ----------
+    dictionaries : Dict[str, DictionaryEncoder], optional
+        The encoders of each string column, by default new encoders.
+    """
+
+    def __init__(self, dictionaries: Optional[Dict[str, DictionaryEncoder]] = None) -> None:
+        if dictionaries is None:
+            dictionaries = {name: DictionaryEncoder() for name in DICTIONARY_COLUMNS}
+        self.dictionaries: Dict[str, DictionaryEncoder] = dictionaries
+        self._rows: List[Tuple[Any, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self) -> None:
+        """Removes every row, keeping the dictionaries."""
+        self._rows = []
+
+    def append(self, id: int, parsed: Mapping[str, Any]) -> None:
+        """Adds an attack from its parser output, only the exported fields are read.
+
+        Parameters
+        ----------
+        id : int
+            The id of the attack.
+        parsed : Mapping[str, Any]
+            The output of `AttackParser.parse`, or the lazy fields of an attack.
+        """
+        self._rows.append((id, *_get_fields(parsed)))
+
+    def column(self, name: str) -> array:
+        """Builds a single column of the batch.
+
+        Parameters
+        ----------
+        name : str
+            The name of an exported column, or "day_submitted" for the days since the unix epoch.
+
+        Returns
+        -------
+        array
+            The packed column.
+        """
+        if name == "day_submitted":
+            ordinals = map(datetime.toordinal, self._values("date_submitted"))
+            return array("i", map(operator.sub, ordinals, repeat(EPOCH_ORDINAL)))
+        values = self._values(name)
+        if name in DICTIONARY_COLUMNS:
+            return self.dictionaries[name].encode_all(values)
+        if name == "date_submitted":
+            values = map(MICROSECOND.__rfloordiv__, map(EPOCH.__rsub__, values))
+        return array(NUMERIC_COLUMNS[name], values)
+
+    def build(self) -> Dict[str, array]:
+        """Builds every exported column of the batch.
+
+        Returns
+        -------
+        Dict[str, array]
+            The packed arrays keyed by column name.
+        """
+        return {name: self.column(name) for name in COLUMNS}
+
+    def _values(self, name: str) -> Iterator[Any]:
+        return map(operator.itemgetter(COLUMNS.index(name)), self._rows)
+
+
+class _ParquetSink:
+    """Writes batches as row groups of a Parquet file."""
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fields = [
+            pa.field("id", pa.int64()),
+            pa.field("points", pa.float64()),
+            pa.field("date_submitted", pa.timestamp("us")),
+        ]
+        string = pa.dictionary(pa.int32(), pa.string())
+        fields.extend(pa.field(name, string) for name in DICTIONARY_COLUMNS)
+        self._schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(path, self._schema)
+        # the arrow dictionary of each column, extended as its encoder grows
+        self._dictionaries: Dict[str, Any] = {}
+        for name in DICTIONARY_COLUMNS:
+            self._dictionaries[name] = pa.array([], pa.string())
+        self._pa = pa
+
+    def write(self, batch: AttackColumns) -> None:
+        pa = self._pa
+        arrays = []
+        columns = batch.build()
+        for field in self._schema:
+            # wrap the packed arrays without copying them
+            column = columns[field.name]
+            kind = pa.int32() if field.name in DICTIONARY_COLUMNS else field.type
+            values = pa.Array.from_buffers(kind, len(column), [None, pa.py_buffer(column)])
+            if field.name in DICTIONARY_COLUMNS:
+                dictionary = self._dictionary(field.name, batch.dictionaries[field.name])
+                values = pa.DictionaryArray.from_arrays(values, dictionary)
+            arrays.append(values)
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def _dictionary(self, name: str, encoder: DictionaryEncoder) -> Any:
+        # only the values added since the previous row group are converted, encoders never remove values
+        dictionary = self._dictionaries[name]
+        if len(encoder) > len(dictionary):
+            added = self._pa.array(encoder.values[len(dictionary) :], self._pa.string())  # noqa: E203
+            dictionary = self._dictionaries[name] = self._pa.concat_arrays([dictionary, added])
+        return dictionary
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class _NumpySink:
+    """Writes batches as numbered `.npz` parts in a directory.
+
+    Each part holds the batch's columns along with the dictionary values added since the previous part.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        import numpy
+
+        os.makedirs(path, exist_ok=True)
+        self._written: Dict[str, int] = {name: 0 for name in DICTIONARY_COLUMNS}
+        self._path: Union[str, os.PathLike] = path
+        self._np = numpy
+        self._parts: int = 0
+
+    def write(self, batch: AttackColumns) -> None:
+        np = self._np
+        arrays: Dict[str, Any] = {}
+        for name, column in batch.build().items():
+            arrays[name] = np.frombuffer(column, dtype=column.typecode)
+        for name, encoder in batch.dictionaries.items():
+            added = encoder.values[self._written[name] :]  # noqa: E203
+            arrays[f"{name}.dictionary"] = np.array(added, dtype=str)
+            self._written[name] = len(encoder)
+
+        np.savez(os.path.join(self._path, f"part-{self._parts:05d}.npz"), **arrays)
+        self._parts += 1
+
+    def close(self) -> None:
+        pass
+
+
+def read_npz(path: Union[str, os.PathLike]) -> Dict[str, Any]:
+    """Reads the columns exported by an `AttackExporter` in the npz format.
+
+    Parameters
+    ----------
+    path : Union[str, os.PathLike]
+        The directory the attacks were exported to.
+
+    Returns
+    -------
+    Dict[str, numpy.ndarray]
+        Each column concatenated across parts, `date_submitted` as `datetime64[us]`.
+        String columns hold codes, their values are under "<column>.dictionary".
+    """
+    import numpy as np
+
+    parts = sorted(f for f in os.listdir(path) if f.startswith("part-") and f.endswith(".npz"))
+    chunks: Dict[str, List[Any]] = {}
+    for part in parts:
+        with np.load(os.path.join(path, part)) as data:
+            for name in data.files:
+                chunks.setdefault(name, []).append(data[name])
+
+    result = {name: np.concatenate(arrays) for name, arrays in chunks.items()}
+    if "date_submitted" in result:
+        result["date_submitted"] = result["date_submitted"].astype("datetime64[us]")
+    return result
+
+
+def get_format(format: Optional[ExportFormat] = None) -> ExportFormat:
+    """Resolves the format attacks should be exported in.
+
+    Parameters
+    ----------
+    format : ExportFormat, optional
+        The format to use, by default parquet if pyarrow is installed, otherwise npz.
+        - `parquet` writes a single Parquet file, requires the `parquet` extra.
+        - `npz` writes a directory of NumPy `.npz` parts, requires the `numpy` extra.
+
+    Returns
+    -------
+    ExportFormat
+        The resolved format.
+
+    Raises
+    ------
+    ValueError
+        Raised when the requested format is unknown or its dependency is not installed.
+    """
+    if format is None:
+        format = "parquet" if importlib.util.find_spec("pyarrow") is not None else "npz"
+    if format not in ("parquet", "npz"):
+        raise ValueError(f"Unknown export format {format!r}")
+    module = "pyarrow" if format == "parquet" else "numpy"
+    if importlib.util.find_spec(module) is None:
+        raise ValueError(f"The {format} export format requires the {module} package to be installed")
+    return format
+
+
+class AttackExporter:
+    """Streams attacks into a columnar file in fixed size chunks, keeping memory bounded.
+
+    Parameters
+    ----------
+    path : Union[str, os.PathLike]
+        The file, or directory for the npz format, to export to.
+    format : ExportFormat, optional
+        The format to export in, by default parquet if pyarrow is installed, otherwise npz.
+    chunk_size : int, optional
+        The number of attacks buffered before they are written, by default 65536.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        format: Optional[ExportFormat] = None,
+        chunk_size: int = 65536,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.format: ExportFormat = get_format(format)
+        self._sink = _ParquetSink(path) if self.format == "parquet" else _NumpySink(path)
+        self._batch: AttackColumns = AttackColumns()
+        self._chunk_size: int = chunk_size
+        self.rows: int = 0
+
+    def __enter__(self) -> AttackExporter:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def add(self, attack: Attack) -> None:
+        """Adds a fetched attack.
+
+        Parameters
+        ----------
+        attack : Attack
+            The attack to export.
+        """
+        self.add_parsed(attack.id, attack._data)
+
+    def add_parsed(self, id: int, parsed: Mapping[str, Any]) -> None:
+        """Adds an attack from its parser output, such as objects restored from an `ObjectStore`.
+
+        Parameters
+        ----------
+        id : int
+            The id of the attack.
+        parsed : Mapping[str, Any]
+            The output of `AttackParser.parse`.
+        """
+        self._batch.append(id, parsed)
+        self.rows += 1
+        if self.rows % self._chunk_size == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered attacks."""
+        if len(self._batch) > 0:
+            self._sink.write(self._batch)
+            self._batch.clear()
+
+    def close(self) -> None:
+        """Writes the buffered attacks and closes the file."""
+        self.flush()
+        self._sink.close()
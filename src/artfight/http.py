@@ -3,18 +3,28 @@ from __future__ import annotations
 import asyncio
 import logging
 import sys
-from typing import Any, Dict, Optional, Union
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
 
 import aiohttp
 
 from artfight import __version__, error
-from artfight.util import Method
+from artfight.cache import CacheEntry, ResponseCache
+from artfight.engine import ParserEngine, get_engine
+from artfight.executor import ParseExecutor
+from artfight.metrics import PHASE_BODY, PHASE_QUEUE, Metrics
+from artfight.retry import RetryPolicy
+from artfight.scheduler import Priority, RequestScheduler
+from artfight.store import ObjectStore
+from artfight.util import Method, SingleFlight
 
 _log = logging.getLogger(__name__)
 
-RETRY_ATTEMPTS = 5
 SESSION_COOKIE = "laravel_session"
 BASE_URL = "https://artfight.net/"
+# The key concurrent logins share.
+LOGIN = "login"
 
 
 def join_url(base: str, route: str) -> str:
@@ -39,6 +49,59 @@ def join_url(base: str, route: str) -> str:
     return base + "/" + route
 
 
+class ConnectionOptions:
+    """Configures the connection pool and timeouts used by `HTTPClient`.
+
+    Parameters
+    ----------
+    limit : int, optional
+        The maximum number of open connections, by default 100.
+    limit_per_host : int, optional
+        The maximum number of open connections to a single host, by default 20.
+    keepalive_timeout : float, optional
+        The number of seconds idle connections are kept open for reuse, by default 30.
+    dns_ttl : int, optional
+        The number of seconds resolved addresses are cached for, by default 300.
+    connect_timeout : float, optional
+        The maximum number of seconds to establish a connection, by default 10.
+    read_timeout : float, optional
+        The maximum number of seconds between reads from a connection, by default 60.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 30,
+        dns_ttl: int = 300,
+        connect_timeout: Optional[float] = 10,
+        read_timeout: Optional[float] = 60,
+    ) -> None:
+        self.keepalive_timeout: float = keepalive_timeout
+        self.connect_timeout: Optional[float] = connect_timeout
+        self.read_timeout: Optional[float] = read_timeout
+        self.limit_per_host: int = limit_per_host
+        self.dns_ttl: int = dns_ttl
+        self.limit: int = limit
+
+    def connector(self) -> aiohttp.TCPConnector:
+        """Creates a connector according to the options."""
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_ttl,
+        )
+
+    def timeout(self) -> aiohttp.ClientTimeout:
+        """Creates a timeout according to the options."""
+        return aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+
+
 class HTTPClient:
     """HTTPClient handles all the HTTP requests performed by artfight-api
 
@@ -48,15 +111,71 @@ class HTTPClient:
             The username to log in with.
         password : str
             The password to log in with.
+        parse_executor : ParseExecutor, optional
+            The executor parsers should run on, by default parsing is performed inline.
+        parse_engine : ParserEngine, optional
+            The engine parsers should build document trees with, by default the fastest available.
+        cache : ResponseCache, optional
+            The cache to store GET responses in, by default responses are not cached.
+        store : ObjectStore, optional
+            The store to persist parsed objects in, by default objects are not persisted.
+        scheduler : RequestScheduler, optional
+            The scheduler all requests are sent through, by default requests are not limited.
+        retry : RetryPolicy, optional
+            The policy deciding how failed requests are retried, by default `RetryPolicy()`.
+        connection : ConnectionOptions, optional
+            The connection pool configuration, by default `ConnectionOptions()`.
+        session : aiohttp.ClientSession, optional
+            A shared session to send requests with instead of creating one, it is not closed with the client.
+        lazy_fields : bool, optional
+            Wether parsers should extract fields as they are accessed instead of up front, by default False.
+        metrics : Metrics, optional
+            The metrics to record requests and parsing in, by default nothing is recorded.
+        base_url : str, optional
+            The url of the artfight website routes are relative to, by default `BASE_URL`.
     """
 
-    def __init__(self, username: str, password: str) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        *,
+        parse_executor: Optional[ParseExecutor] = None,
+        parse_engine: Optional[ParserEngine] = None,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[ObjectStore] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        retry: Optional[RetryPolicy] = None,
+        connection: Optional[ConnectionOptions] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        lazy_fields: bool = False,
+        metrics: Optional[Metrics] = None,
+        base_url: str = BASE_URL,
+    ) -> None:
         user_agent = "Artfight Bot (https://github.com/NimajnebEC/artfight-api v{0}) Python/{1[0]}.{1[1]} aiohttp/{2}"
         self.user_agent: str = user_agent.format(__version__, sys.version_info, aiohttp.__version__)
-        self._client: Union[aiohttp.ClientSession, None] = None
+        self.connection: ConnectionOptions = connection or ConnectionOptions()
+        self._client: Union[aiohttp.ClientSession, None] = session
+        self._owns_client: bool = session is None
         self._session: Union[str, None] = None
+        # the number of authenticated responses recieved, showing sessions are being accepted
+        self._authorized: int = 0
         self._username: str = username
         self._password: str = password
+        self.parse_executor: ParseExecutor = parse_executor or ParseExecutor()
+        self.parse_engine: ParserEngine = get_engine(parse_engine)
+        self.lazy_fields: bool = lazy_fields
+        self.metrics: Optional[Metrics] = metrics
+        self.base_url: str = base_url
+        self.cache: Optional[ResponseCache] = cache
+        self.store: Optional[ObjectStore] = store
+        self.scheduler: RequestScheduler = scheduler or RequestScheduler()
+        self.retry: RetryPolicy = retry or RetryPolicy()
+        self._logins: SingleFlight = SingleFlight()
+        self.inflight: SingleFlight = SingleFlight()
+        # live shared instances of objects, keyed by type and id
+        self.interned: weakref.WeakValueDictionary[Tuple[type, Hashable], Any]
+        self.interned = weakref.WeakValueDictionary()
 
     async def __aenter__(self) -> HTTPClient:
         return self
@@ -65,9 +184,23 @@ class HTTPClient:
         await self.close()
 
     async def close(self):
-        """Closes the HTTP connection if it exists."""
-        if self._client is not None:
+        """Closes the HTTP connection if it exists and was created by the client."""
+        if self._client is not None and self._owns_client:
             await self._client.close()
+            self._client = None
+
+    def _get_client(self) -> aiohttp.ClientSession:
+        """Returns the client session, creating it if it does not exist yet.
+
+        This never yields to the event loop so concurrent first requests share one session.
+        """
+        if self._client is None:
+            self._client = aiohttp.ClientSession(
+                connector=self.connection.connector(),
+                timeout=self.connection.timeout(),
+                trace_configs=None if self.metrics is None else [self.metrics.trace_config()],
+            )
+        return self._client
 
     async def request(
         self,
@@ -76,7 +209,9 @@ class HTTPClient:
         *,
         form: Optional[Dict[str, Any]] = None,
         authenticated: bool = True,
-    ) -> str:
+        priority: Priority = Priority.INTERACTIVE,
+        reader: Optional[Callable[[aiohttp.ClientResponse], Awaitable[Any]]] = None,
+    ) -> Any:
         """Wraps aiohttp requests
 
         Parameters
@@ -87,129 +222,217 @@ class HTTPClient:
             If specified, the form data to include in the body of the request., by default None.
         authenticated : bool, optional
             Wether the client should be authenticated to perform this request, by default True.
+        priority : Priority, optional
+            The priority the request is scheduled with, by default `Priority.INTERACTIVE`.
+        reader : Callable[[aiohttp.ClientResponse], Awaitable[Any]], optional
+            If specified, consumes successful responses in place of reading the body as text, by default None.
+            Responses consumed by a reader are never cached and it may be called again if the request is retried.
 
         Returns
         -------
-        str
-            The HTML returned by the request or the redirect destination.
+        Any
+            The HTML returned by the request, the value returned by the reader or the redirect destination.
 
         Raises
         ------
         NotAuthenticated
             Raised when an authenticated request is attempted before the client has logged in.
         UnauthorizedError
-            Raised when trying to access a protected route when not logged in.
+            Raised when trying to access a protected route when not logged in,
+            and logging in again didn't help.
         NotFoundError
             Raised when the server replies with 404.
         ArtfightServerError
             Raised when an error occurs on the artfight servers.
         HTTPResponseError
             Raised when an arbitrary response it recieved.
-        RuntimeError
-            Raised when the HTTP connection has not been initialised.
+        aiohttp.ClientError
+            Raised when a connection error persists after retrying.
         """
-        url = join_url(BASE_URL, url)
-        data = None
+        route = url
+        url = join_url(self.base_url, url)
 
-        # ensure client is set up
-        if self._client is None:
-            self._client = aiohttp.ClientSession()
+        client = self._get_client()
 
         # initialise headers
         headers: dict[str, str] = {
             "User-Agent": self.user_agent,
         }
 
-        # add session cookie
-        if self._session is None:
-            if authenticated:
-                _log.debug("Session not found; logging in...")
-                await self.login()
-        else:
-            headers["Cookie"] = f"{SESSION_COOKIE}={self._session}"
-
-        # add form data if applicable
-        if form is not None:
-            data = aiohttp.FormData(form)
-
-        response = None
-        for tries in range(RETRY_ATTEMPTS):
-            await asyncio.sleep(tries * 2)
-
+        # check the cache, login responses are never cached
+        cached: Union[CacheEntry, None] = None
+        if self.cache is not None and method == "GET" and reader is None:
+            cached = self.cache.get(method, url)
+            if cached is not None:
+                if cached.fresh:
+                    return cached.body
+                headers.update(cached.validators)
+
+        # ensure logged in
+        if self._session is None and authenticated:
+            _log.debug("Session not found; logging in...")
+            await self.login()
+
+        metrics = self.metrics
+        start = time.monotonic()
+        relogin = False
+        # consecutive logins which weren't followed by any request being authorized
+        authorized, stalled = self._authorized, 0
+        session = None
+        attempt = 0
+        while True:
+            attempt += 1
+
+            # login outside of the request slot, unless another request already has
+            if relogin:
+                relogin = False
+                if LOGIN in self._logins or self._session == session:
+                    await self.login()
+
+            # add session cookie
+            session = self._session
+            if session is not None:
+                headers["Cookie"] = f"{SESSION_COOKIE}={session}"
+
+            failure: Union[BaseException, None] = None
+            retry_after: Union[str, None] = None
+            status: Union[int, None] = None
             try:
-                async with self._client.request(
-                    allow_redirects=False,
-                    method=method,
-                    headers=headers,
-                    data=data,
-                    url=url,
-                ) as response:
-                    _log.debug("%s %s : %s", method, url, response.status)
-
-                    # update session
-                    token = response.cookies.get(SESSION_COOKIE)
-                    if token is not None:
-                        self._session = token.value
-
-                    # successful request
-                    if 300 > response.status >= 200:
-                        return await response.text()
-
-                    # redirected
-                    if response.status == 302:
-                        # check redirected to login (unauthorized)
-                        location = response.headers.get("Location")
-                        if location is not None:
-                            if location.endswith("/login"):
-                                # login and try again
-                                if authenticated:
-                                    _log.debug("Unauthorized response recieved; logging in and trying again...")
-                                    await self.login()
-                                    tries -= 0
-                                    continue
-                                raise error.UnauthorizedError(method, url)
-                            return location
-
-                    # unconditional retry
-                    if response.status in (500, 502, 504, 524):
-                        continue
-
-                    # special errors
-                    elif response.status == 404:
-                        raise error.NotFoundError(method, url)
-                    elif response.status >= 500:
-                        raise error.ArtfightServerError(method, url, response.status)
-                    else:
-                        raise error.HTTPResponseError(method, url, response.status)
-
-            except OSError as e:
-                # connection reset
-                if e.errno in (54, 10054):
-                    continue
-                raise
-
-        if response is not None:
-            # We've run out of retries, raise.
-            if response.status >= 500:
-                raise error.ArtfightServerError(method, url, response.status)
-            raise error.HTTPResponseError(method, url, response.status)
-
-        raise RuntimeError("_RETRY_ATTEMPTS was < 1")
+                queued = time.perf_counter() if metrics is not None else 0
+                async with self.scheduler.slot(priority):
+                    if metrics is not None:
+                        queued = time.perf_counter() - queued
+                        metrics.observe("artfight_request_phase_seconds", queued, PHASE_QUEUE)
+                    async with client.request(
+                        allow_redirects=False,
+                        method=method,
+                        headers=headers,
+                        data=None if form is None else aiohttp.FormData(form),
+                        url=url,
+                    ) as response:
+                        _log.debug("%s %s : %s", method, url, response.status)
+                        if metrics is not None:
+                            labels = (("method", method), ("status", str(response.status)))
+                            metrics.increment("artfight_requests_total", labels)
+
+                        # update session
+                        token = response.cookies.get(SESSION_COOKIE)
+                        if token is not None:
+                            self._session = token.value
+
+                        if authenticated and (response.status == 304 or 300 > response.status >= 200):
+                            self._authorized += 1
+
+                        # cached response is still valid
+                        if response.status == 304 and cached is not None:
+                            self.cache.revalidated(method, url, route)  # type: ignore
+                            return cached.body
+
+                        # successful request
+                        if 300 > response.status >= 200:
+                            read = time.perf_counter()
+                            body = await (response.text() if reader is None else reader(response))
+                            if metrics is not None:
+                                read = time.perf_counter() - read
+                                metrics.observe("artfight_request_phase_seconds", read, PHASE_BODY)
+                            if reader is not None:
+                                return body
+                            # never cache responses which set the session
+                            if self.cache is not None and method == "GET" and token is None:
+                                self.cache.put(
+                                    method,
+                                    url,
+                                    route,
+                                    body,
+                                    etag=response.headers.get("ETag"),
+                                    last_modified=response.headers.get("Last-Modified"),
+                                )
+                            return body
+
+                        # redirected
+                        if response.status == 302:
+                            # check redirected to login (unauthorized)
+                            location = response.headers.get("Location")
+                            if location is not None:
+                                if location.endswith("/login"):
+                                    # login and try again without counting an attempt, as often as sessions
+                                    # keep being accepted, concurrent requests may expire them before this one
+                                    stalled = stalled + 1 if self._authorized == authorized else 1
+                                    authorized = self._authorized
+                                    if authenticated and stalled <= self.retry.attempts:
+                                        _log.debug("Unauthorized response recieved; logging in and trying again...")
+                                        relogin = True
+                                        attempt -= 1
+                                        continue
+                                    raise error.UnauthorizedError(method, url)
+                                return location
+
+                        # retry according to policy
+                        status = response.status
+                        if self.retry.retries_status(status):
+                            retry_after = response.headers.get("Retry-After")
+
+                        # special errors
+                        elif status == 404:
+                            raise error.NotFoundError(method, url)
+                        elif status >= 500:
+                            raise error.ArtfightServerError(method, url, status)
+                        else:
+                            raise error.HTTPResponseError(method, url, status)
+
+            except (OSError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not self.retry.retries_exception(e):
+                    raise
+                _log.debug("%s %s : %r", method, url, e)
+                failure = e
+
+            delay = self.retry.next_delay(attempt, time.monotonic() - start, status, retry_after)
+            if delay is None:
+                # We've run out of retries, raise.
+                if failure is not None:
+                    raise failure
+                if status >= 500:  # type: ignore
+                    raise error.ArtfightServerError(method, url, status)
+                raise error.HTTPResponseError(method, url, status)
+
+            _log.debug("Retrying %s %s in %.2fs (attempt %d)", method, url, delay, attempt)
+            if metrics is not None:
+                reason = str(status) if failure is None else type(failure).__name__
+                metrics.increment("artfight_retries_total", (("reason", reason),))
+                metrics.observe("artfight_retry_backoff_seconds", delay)
+            await asyncio.sleep(delay)
 
     async def login(self) -> None:
         """Login to the artfight servers using the specified credentials
 
+        Concurrent calls share a single login request.
+
         Raises
         ------
         LoginError
             Raised when the provided credentials are invalid
         """
+        await self._logins.run(LOGIN, self._login)
+
+    async def _login(self) -> None:
+        """Performs the login request."""
+        _log.debug("Logging in as %s", self._username)
         try:
             await self.request(
                 "POST",
                 "/login",
                 authenticated=False,
+                priority=Priority.LOGIN,
                 form={"username": self._username, "password": self._password},
             )
         except error.UnauthorizedError:
+            self._count_login("failure")
             raise error.LoginError()
+        except BaseException:
+            self._count_login("error")
+            raise
+        self._count_login("success")
+
+    def _count_login(self, result: str) -> None:
+        if self.metrics is not None:
+            self.metrics.increment("artfight_logins_total", (("result", result),))
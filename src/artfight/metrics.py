@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import aiohttp
+
+__all__ = ("Metrics", "Histogram", "Labels")
+
+# Sorted pairs of label names and values.
+Labels = Tuple[Tuple[str, str], ...]
+
+# The upper bounds of histogram buckets.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+)
+SIZE_BUCKETS: Tuple[float, ...] = tuple(float(1 << n) for n in range(10, 25, 2))
+
+# Every recorded metric, keyed by name, with its type, help text and histogram buckets.
+METRICS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    "artfight_requests_total": (
+        "counter",
+        "Responses recieved, by method and status.",
+        (),
+    ),
+    "artfight_request_phase_seconds": (
+        "histogram",
+        "Duration of each phase of a request attempt, by phase.",
+        LATENCY_BUCKETS,
+    ),
+    "artfight_connections_reused_total": (
+        "counter",
+        "Requests sent over a pooled connection.",
+        (),
+    ),
+    "artfight_dns_cache_hits_total": (
+        "counter",
+        "Host lookups answered by the DNS cache.",
+        (),
+    ),
+    "artfight_retries_total": (
+        "counter",
+        "Request attempts retried, by status or exception.",
+        (),
+    ),
+    "artfight_retry_backoff_seconds": (
+        "histogram",
+        "Delay before each retried attempt.",
+        LATENCY_BUCKETS,
+    ),
+    "artfight_logins_total": (
+        "counter",
+        "Login requests, by result.",
+        (),
+    ),
+    "artfight_parse_seconds": (
+        "histogram",
+        "Duration of parsing a page, by parser.",
+        LATENCY_BUCKETS,
+    ),
+    "artfight_parse_document_characters": (
+        "histogram",
+        "Length of each parsed page, by parser.",
+        SIZE_BUCKETS,
+    ),
+    "artfight_parse_errors_total": (
+        "counter",
+        "Pages which failed to parse, by parser.",
+        (),
+    ),
+}
+
+# The phases recorded by `artfight_request_phase_seconds`.
+PHASE_QUEUE: Labels = (("phase", "queue"),)
+PHASE_POOL: Labels = (("phase", "pool"),)
+PHASE_DNS: Labels = (("phase", "dns"),)
+PHASE_CONNECT: Labels = (("phase", "connect"),)
+PHASE_TTFB: Labels = (("phase", "ttfb"),)
+PHASE_BODY: Labels = (("phase", "body"),)
+
+
+class Histogram:
+    """Counts observations into buckets by their upper bound.
+
+    Parameters
+    ----------
+    bounds : Sequence[float]
+        The sorted upper bounds of the buckets, an unbounded bucket is always added.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds: Tuple[float, ...] = tuple(bounds)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.sum: float = 0
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} count={self.count} sum={self.sum}>"
+
+    def observe(self, value: float) -> None:
+        """Records a value.
+
+        Parameters
+        ----------
+        value : float
+            The value to record.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates a quantile by interpolating within the bucket it falls in.
+
+        Parameters
+        ----------
+        q : float
+            The quantile to estimate, between 0 and 1.
+
+        Returns
+        -------
+        Optional[float]
+            The estimated value, the largest bound if it falls in the unbounded bucket,
+            or `None` if nothing has been observed.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i > 0 else 0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Returns the number of observations less than or equal to each bound, ending with infinity."""
+        result = []
+        total = 0
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """Collects counters and histograms describing requests and parsing.
+
+    Pass an instance to `ArtfightClient` to enable collection, without one nothing is recorded.
+    Request phases are recorded through aiohttp trace hooks, which are only installed on sessions
+    created by the client, add `trace_config` to a shared session to record them as well.
+    Metrics are recorded on the event loop and are not synchronised between threads.
+
+    The recorded phases of each request attempt are:
+    - `queue` waiting for the `RequestScheduler` to grant a slot.
+    - `pool` waiting for a free connection in the pool.
+    - `dns` resolving the host, when it is not cached.
+    - `connect` opening a new connection, including the TLS handshake.
+    - `ttfb` from sending the request headers to recieving the response headers.
+    - `body` reading the response body.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.started: float = time.time()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} series={len(self._counters) + len(self._histograms)}>"
+
+    def increment(self, name: str, labels: Labels = (), value: float = 1) -> None:
+        """Increments a counter.
+
+        Parameters
+        ----------
+        name : str
+            The name of the counter.
+        labels : Labels, optional
+            The labels of the series to increment, by default none.
+        value : float, optional
+            The amount to increment by, by default 1.
+        """
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Records a value in a histogram.
+
+        Parameters
+        ----------
+        name : str
+            The name of the histogram.
+        value : float
+            The value to record.
+        labels : Labels, optional
+            The labels of the series to record in, by default none.
+        """
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(METRICS[name][2])
+        histogram.observe(value)
+
+    def reset(self) -> None:
+        """Discards everything recorded so far."""
+        self._counters.clear()
+        self._histograms.clear()
+        self.started = time.time()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Returns the current value of every recorded series.
+
+        Returns
+        -------
+        Dict[str, List[Dict[str, Any]]]
+            The series of each metric keyed by name, each with its "labels".
+            Counters have a "value", histograms have a "count", "sum" and estimated
+            "p50", "p90" and "p99" along with the cumulative "buckets" keyed by upper bound.
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for (name, labels), value in list(self._counters.items()):
+            result.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), histogram in list(self._histograms.items()):
+            result.setdefault(name, []).append(
+                {
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p90": histogram.quantile(0.9),
+                    "p99": histogram.quantile(0.99),
+                    "buckets": dict(histogram.cumulative()),
+                }
+            )
+        return result
+
+    def prometheus(self) -> str:
+        """Returns every recorded series in the Prometheus text exposition format."""
+        series: Dict[str, List[str]] = {}
+        for (name, labels), value in sorted(self._counters.items()):
+            series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+            lines = series.setdefault(name, [])
+            for bound, count in histogram.cumulative():
+                le = _format_labels((*labels, ("le", _format_value(bound))))
+                lines.append(f"{name}_bucket{le} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        output = []
+        for name in sorted(series):
+            kind, help, _ = METRICS.get(name, ("untyped", name, ()))
+            output.append(f"# HELP {name} {help}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(series[name])
+        return "\n".join(output) + "\n" if output else ""
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Creates a trace config recording the phases of each request sent by a session.
+
+        Returns
+        -------
+        aiohttp.TraceConfig
+            The trace config, to be provided to `aiohttp.ClientSession`.
+        """
+        import aiohttp
+
+        config = aiohttp.TraceConfig()
+        observe, increment = self.observe, self.increment
+        now = time.perf_counter
+
+        def phase(labels: Labels) -> Tuple[Any, Any]:
+            # phases nest, dns is resolved while connecting, so each keeps its own start time
+            attr = f"start_{labels[0][1]}"
+
+            async def start(_: Any, context: SimpleNamespace, __: Any) -> None:
+                setattr(context, attr, now())
+
+            async def end(_: Any, context: SimpleNamespace, __: Any) -> None:
+                started = getattr(context, attr, None)
+                if started is not None:
+                    observe("artfight_request_phase_seconds", now() - started, labels)
+                    setattr(context, attr, None)
+
+            return start, end
+
+        async def reused(*_: Any) -> None:
+            increment("artfight_connections_reused_total")
+
+        async def cache_hit(*_: Any) -> None:
+            increment("artfight_dns_cache_hits_total")
+
+        signals = (
+            (config.on_connection_queued_start, config.on_connection_queued_end, PHASE_POOL),
+            (config.on_connection_create_start, config.on_connection_create_end, PHASE_CONNECT),
+            (config.on_dns_resolvehost_start, config.on_dns_resolvehost_end, PHASE_DNS),
+            (config.on_request_headers_sent, config.on_request_end, PHASE_TTFB),
+        )
+        for on_start, on_end, labels in signals:
+            start, end = phase(labels)
+            on_start.append(start)
+            on_end.append(end)
+        config.on_connection_reuseconn.append(reused)
+        config.on_dns_cache_hit.append(cache_hit)
+        return config
+
+
+def _format_value(value: Union[int, float]) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
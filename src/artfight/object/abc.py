@@ -3,16 +3,19 @@ from __future__ import annotations
 from abc import ABC
 from typing import Any, Generic, Optional, Type, TypeVar
 
-from artfight.http import BASE_URL, HTTPClient, join_url
+from artfight.http import HTTPClient, join_url
 from artfight.parser import BaseParser
 
 F = TypeVar("F", bound="ArtfightObject")
+A = TypeVar("A", bound="ArtfightObject")
 T = TypeVar("T")
 
 
 class ArtfightObject(ABC, Generic[T, F]):
     """Represents a structure from the artfight website."""
 
+    __slots__ = ("_http", "_id", "__weakref__")
+
     _PARSER: Type[BaseParser[F]]
     _URL: str
 
@@ -32,9 +35,34 @@ class ArtfightObject(ABC, Generic[T, F]):
     def __eq__(self, __value: object) -> bool:
         return isinstance(__value, type(self)) and self.id == __value.id
 
+    def __hash__(self) -> int:
+        return hash(self._id)
+
     def __repr__(self) -> str:
         return f"<{type(self).__name__} id={repr(self.id)}>"
 
+    @classmethod
+    def intern(cls: Type[A], id: Any, http: HTTPClient) -> A:
+        """Returns the live instance of this type with the provided id, creating it if there isn't one.
+
+        Parameters
+        ----------
+        id : Any
+            The unique identifier of the object.
+        http : HTTPClient
+            An `HTTPClient` instance, which holds the interned instances.
+
+        Returns
+        -------
+        A
+            The shared instance.
+        """
+        key = (cls, id)
+        result = http.interned.get(key)
+        if result is None:
+            result = http.interned[key] = cls(id, http)
+        return result
+
     def _get_attr(self, name: str) -> Optional[Any]:
         """Returns the specified attribute if it exists.
 
@@ -62,11 +90,20 @@ class ArtfightObject(ABC, Generic[T, F]):
         """The url to this object."""
         if not hasattr(self, "_URL"):
             raise NotImplementedError("Object did not specify a url template.")
-        return join_url(BASE_URL, self._URL % (self.id,))
+        return join_url(self._http.base_url, self._URL % (self.id,))
+
+    async def fetch(self, parser: Optional[BaseParser[F]] = None) -> F:
+        """Fetch a full instance of this partial.
 
-    async def fetch(self) -> F:
-        """Fetch a full instance of this partial."""
+        Each fetch updates and returns the same live full instance for this object's id.
+
+        Parameters
+        ----------
+        parser : BaseParser[F], optional
+            An instance of this object's parser to reuse, by default a new one is created.
+        """
         if not hasattr(self, "_PARSER"):
             raise NotImplementedError("Object did not specify a parser.")
-        parser = self._PARSER(self._http)
+        if parser is None:
+            parser = self._PARSER(self._http)
         return await parser.run(self.id)
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, List
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from bs4 import BeautifulSoup, ResultSet, Tag
+from bs4 import ResultSet, Tag
 
 from artfight.http import HTTPClient
 from artfight.object import user
 from artfight.object.abc import ArtfightObject
 from artfight.object.character import PartialCharacter
-from artfight.parser import BaseParser
+from artfight.parser import BaseParser, LazyFields, ParserEngine, RegionStrainer
 from artfight.util import (
     DATE_FORMAT,
     RE_BACKGROUND_IMAGE,
@@ -20,68 +20,117 @@ from artfight.util import (
 __all__ = ("PartialAttack", "Attack")
 
 
+def _header(fields: LazyFields) -> Tag:
+    return fields.soup.select_one(".profile-header")  # type: ignore
+
+
+def _title(fields: LazyFields) -> str:
+    return fields["_header"].select_one(".profile-header-name").a.u.text
+
+
+def _thumbnail(fields: LazyFields) -> str:
+    icon = fields["_header"].find("span", {"class": "icon-attack"})
+    return RE_BACKGROUND_IMAGE.search(icon.attrs.get("style")).group(1)  # type: ignore
+
+
+def _date_submitted(fields: LazyFields) -> datetime:
+    card = fields.soup.select_one(".profile-header-mobile-status > .card > .card-body")
+    submitted_date: Tag = card.find_all("div", recursive=False)[1]  # type: ignore
+    return datetime.strptime(
+        submitted_date.find(text=True, recursive=False),  # type: ignore
+        DATE_FORMAT,
+    )
+
+
+def _image(fields: LazyFields) -> str:
+    return fields.soup.select_one("#image-pane").find("img").attrs.get("src")  # type: ignore
+
+
+def _info_table(fields: LazyFields) -> Tag:
+    return fields.soup.find("div", {"class": "card-header"}, string="Attack Info").parent.find("table")  # type: ignore
+
+
+def _info(fields: LazyFields) -> Dict[str, Tag]:
+    return table_to_dict(fields["_info_table"])
+
+
+def _attacker(fields: LazyFields) -> str:
+    return fields["_info"]["From"].find("a").text.strip()  # type: ignore
+
+
+def _defender(fields: LazyFields) -> str:
+    return fields["_info"]["To"].find("a").text.strip()  # type: ignore
+
+
+def _team(fields: LazyFields) -> str:
+    return fields["_info"]["Team"].find("a").text  # type: ignore
+
+
+def _characters(fields: LazyFields) -> List[Tuple[int, str]]:
+    characters: Dict[int, str] = {}
+    links: ResultSet[Tag] = fields["_info_table"].find_all("a")
+    for link in links:
+        href = link.attrs.get("href")
+        if href is None:
+            continue
+        match = RE_CHARACTER_URL.search(href)
+        if match is None:
+            continue
+        characters.setdefault(int(match.group(1)), link.i.text)  # type: ignore
+    return list(characters.items())
+
+
+def _stats(fields: LazyFields) -> Dict[str, Tag]:
+    stats_tag = fields.soup.find("div", {"class": "card-header"}, string="Attack Stats").parent.find("table")  # type: ignore
+    return table_to_dict(stats_tag)  # type: ignore
+
+
+def _points(fields: LazyFields) -> float:
+    return float(fields["_stats"]["Points"].find(text=True, recursive=False).strip())  # type: ignore
+
+
+def _type(fields: LazyFields) -> str:
+    return fields["_stats"]["Type"].text
+
+
 class AttackParser(BaseParser["Attack"]):
+    _FIELDS = {
+        "_header": _header,
+        "_info_table": _info_table,
+        "_info": _info,
+        "_stats": _stats,
+        "title": _title,
+        "thumbnail": _thumbnail,
+        "date_submitted": _date_submitted,
+        "image": _image,
+        "attacker": _attacker,
+        "defender": _defender,
+        "team": _team,
+        "characters": _characters,
+        "points": _points,
+        "type": _type,
+    }
+    _REGIONS = RegionStrainer(classes=("profile-header", "card"), ids=("image-pane",))
+    _STORE = "attack"
     _ROUTE = "/attack/%s"
 
-    def parse(self, data: str, *args: Any) -> Attack:
-        result = Attack(args[0], self.http)
-        soup = BeautifulSoup(data, "html.parser")
-        header = soup.select_one(".profile-header")
-
-        # Extract Title
-        result._title = header.select_one(".profile-header-name").a.u.text  # type: ignore
-
-        # Extract Thumbnail
-        icon = header.find("span", {"class": "icon-attack"})  # type: ignore
-        result._thumbnail = RE_BACKGROUND_IMAGE.search(icon.attrs.get("style")).group(1)  # type: ignore
-
-        # Extract Date Submitted
-        card = soup.select_one(".profile-header-mobile-status > .card > .card-body")  # type: ignore
-        submitted_date: ResultSet[Tag] = card.find_all("div", recursive=False)[1]  # type: ignore
-        result._date_submitted = datetime.strptime(
-            submitted_date.find(text=True, recursive=False),  # type: ignore
-            DATE_FORMAT,
-        )
-
-        # Extract Image
-        result._image = soup.select_one("#image-pane").find("img").attrs.get("src")  # type: ignore
-
-        # Extract Info
-        info_tag = soup.find("div", {"class": "card-header"}, string="Attack Info").parent.find("table")  # type: ignore
-        info = table_to_dict(info_tag)  # type: ignore
-
-        result._attacker = user.PartialUser(info["From"].find("a").text.strip(), self.http)  # type: ignore
-        result._defender = user.PartialUser(info["To"].find("a").text.strip(), self.http)  # type: ignore
-        result._team = info["Team"].find("a").text  # type: ignore
-
-        # Extract Characters
-        result._characters = []
-        links: ResultSet[Tag] = info_tag.find_all("a")  # type: ignore
-        for link in links:
-            href = link.attrs.get("href")
-            if href is None:
-                continue
-            match = RE_CHARACTER_URL.search(href)
-            if match is None:
-                continue
-            char = PartialCharacter(int(match.group(1)), self.http)
-            char._name = link.i.text  # type: ignore
-            if char not in result._characters:
-                result._characters.append(char)
-
-        # Extract Stats
-        stats_tag = soup.find("div", {"class": "card-header"}, string="Attack Stats").parent.find("table")  # type: ignore
-        stats = table_to_dict(stats_tag)  # type: ignore
-
-        result._points = float(stats["Points"].find(text=True, recursive=False).strip())  # type: ignore
-        result._type = stats["Type"].text
+    @classmethod
+    def parse(cls, data: str, *args: Any, engine: ParserEngine = "html.parser") -> Dict[str, Any]:
+        return dict(LazyFields(cls.soup(data, engine), cls._FIELDS))
 
+    def build(self, parsed: Mapping[str, Any], *args: Any) -> Attack:
+        result = Attack.intern(args[0], self.http)
+        result._data = parsed
+        # lazily parsed pages only extract their characters once they are read
+        result._characters = None if isinstance(parsed, LazyFields) else result._build_characters()
         return result
 
 
 class PartialAttack(ArtfightObject[int, "Attack"]):
     """Represents an Artfight attack that does not have all data present."""
 
+    __slots__ = ()
+
     _PARSER = AttackParser
     _URL = "/attack/%s"
 
@@ -89,65 +138,70 @@ class PartialAttack(ArtfightObject[int, "Attack"]):
 class Attack(PartialAttack):
     """Represents an Artfight attack."""
 
+    __slots__ = ("_data", "_characters")
+
     def __init__(self, id: int, http: HTTPClient) -> None:
         super().__init__(id, http)
-        self._characters: List[PartialCharacter]
-        self._attacker: user.PartialUser
-        self._defender: user.PartialUser
-        self._date_submitted: datetime
-        self._thumbnail: str
-        self._points: float
-        self._title: str
-        self._type: str
-        self._image: str
-        self._team: str
+        self._data: Mapping[str, Any]
+        self._characters: Optional[List[PartialCharacter]] = None
+
+    def _build_characters(self) -> List[PartialCharacter]:
+        result = []
+        for id, name in self._data["characters"]:
+            char = PartialCharacter.intern(id, self._http)
+            char._name = name
+            result.append(char)
+        return result
 
     @property
     def characters(self) -> List[PartialCharacter]:
         """All the characters present in this attack."""
-        return self._characters
+        if self._characters is None:
+            self._characters = self._build_characters()
+        # a copy, so callers can't alter the cached list
+        return list(self._characters)
 
     @property
     def attacker(self) -> user.PartialUser:
         """The user who submitted this attack."""
-        return self._attacker
+        return user.PartialUser.intern(self._data["attacker"], self._http)
 
     @property
     def defender(self) -> user.PartialUser:
         """The user this attack was against."""
-        return self._defender
+        return user.PartialUser.intern(self._data["defender"], self._http)
 
     @property
     def date_submitted(self) -> datetime:
         """The datetime this attack was submitted."""
-        return self._date_submitted
+        return self._data["date_submitted"]
 
     @property
     def thumbnail(self) -> str:
         """The url to this attack's thumbnail."""
-        return self._thumbnail
+        return self._data["thumbnail"]
 
     @property
     def points(self) -> float:
         """The number of points this attack rewarded the attacker's team."""
-        return self._points
+        return self._data["points"]
 
     @property
     def title(self) -> str:
         """The title of the attack."""
-        return self._title
+        return self._data["title"]
 
     @property
     def type(self) -> str:
         """The type of media uploaded in the attack."""
-        return self._type
+        return self._data["type"]
 
     @property
     def image(self) -> str:
         """The url to this attack's main image."""
-        return self._image
+        return self._data["image"]
 
     @property
     def team(self) -> str:
         """The team of the attacker."""
-        return self._team
+        return self._data["team"]
@@ -9,6 +9,8 @@ from artfight.object.abc import ArtfightObject
 class PartialCharacter(ArtfightObject[int, "Character"]):
     """Represents an Artfight character that does not have all data present."""
 
+    __slots__ = ("_name",)
+
     _URL = "/character/%s"
 
     def __init__(self, id: int, http: HTTPClient) -> None:
@@ -24,6 +26,8 @@ class PartialCharacter(ArtfightObject[int, "Character"]):
 class Character(PartialCharacter):
     """Represents an Artfight character."""
 
+    __slots__ = ()
+
     @property
     def name(self) -> str:
         """The name of this character."""
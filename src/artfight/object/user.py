@@ -1,63 +1,262 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
+import itertools
+import logging
+import re
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Tuple
-
-from bs4 import BeautifulSoup, ResultSet, Tag
-
+from html.parser import HTMLParser
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import aiohttp
+from bs4 import ResultSet, Tag
+
+from artfight.error import ParseError
 from artfight.http import HTTPClient
 from artfight.object import attack
 from artfight.object.abc import ArtfightObject
-from artfight.parser import BaseParser
-from artfight.util import DATE_FORMAT, RE_BACKGROUND_IMAGE, table_to_dict
+from artfight.parser import BaseParser, LazyFields, ParserEngine, RegionStrainer
+from artfight.scheduler import Priority
+from artfight.util import DATE_FORMAT, RE_BACKGROUND_IMAGE, table_to_dict, windowed
 
 if TYPE_CHECKING:
     from artfight.object.attack import PartialAttack
 
 __all__ = ("PartialUser", "User")
 
+_log = logging.getLogger(__name__)
+
+
+def _content(*tags: str) -> str:
+    """Returns a pattern matching markup containing none of the provided tags, opening or closing."""
+    return r"[^<]*(?:<(?!/?(?:%s)\b)[^<]*)*" % "|".join(tags)
+
+
+def _attributes(markup: str) -> Optional[Dict[str, str]]:
+    """Reads attributes matched by `_ATTRIBUTES`, `None` if any are repeated or contain character references."""
+    result: Dict[str, str] = {}
+    for name, double, single, unquoted in RE_ATTRIBUTE.findall(markup):
+        name = name.lower()
+        value = double or single or unquoted
+        if name in result or "&" in value:
+            return None
+        result[name] = value
+    return result
+
+
+def _classes(attributes: Dict[str, str]) -> List[str]:
+    return attributes.get("class", "").split()
+
+
+# The attributes of a tag, quoted values may contain anything but their quote.
+_ATTRIBUTES = r"""(?:\s+[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?)*\s*"""
+RE_ATTRIBUTE = re.compile(r"""\s+([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+
+# The layout of an attack list page expected by `AttackListParser.scan`.
+RE_ATTACKS_BODY = re.compile(r"<div\b(%s)>" % _ATTRIBUTES)
+RE_ATTACK_LIST = re.compile(_content("div", "nav") + r"(?:<div\b(%s)>|</div>)" % _ATTRIBUTES)
+RE_ATTACK_CARD = re.compile(
+    r"\s*<div\b%s>\s*<a\b(%s)>" % (_ATTRIBUTES, _ATTRIBUTES) + _content("div", "a", "nav") + r"</a>\s*</div>"
+)
+RE_ATTACK_PAGINATION = re.compile(
+    r"\s*</div>\s*<nav\b%s>\s*<ul\b(%s)>(%s)</ul>\s*</nav>" % (_ATTRIBUTES, _ATTRIBUTES, _content("div", "nav", "ul"))
+)
+RE_ATTACKS_BODY_END = re.compile(r"\s*</div>\s*</div>")
+RE_LIST_ITEM = re.compile(r"[^<]*<li\b(%s)>%s</li>" % (_ATTRIBUTES, _content("div", "nav", "ul", "li")))
+# Markup the scanner doesn't interpret, comments, tag names in other cases and raw text elements,
+# which may hide or contain tags.
+RE_UNSCANNABLE = re.compile(
+    r"<(?:[!?]|/?[\w-]*[A-Z]|/?(?:script|style|textarea|template|title|iframe|noscript|xmp|plaintext)\b)"
+)
+# A class containing a character reference, which could name the attack list body without spelling it out.
+RE_CLASS_REFERENCE = re.compile(r"""class\s*=\s*(?:"[^"&]*&|'[^'&]*&|[^\s"'>&]*&)""")
+
+
+def _header(fields: LazyFields) -> Tag:
+    return fields.soup.select_one(".profile-header")  # type: ignore
 
-class ProfileParser(BaseParser["User"]):
-    _ROUTE = "/~%s"
 
-    def parse(self, data: str, *args: Any) -> User:
-        result = User(args[0], self.http)
-        soup = BeautifulSoup(data, features="html.parser")
-        header = soup.select_one(".profile-header")
+def _info(fields: LazyFields) -> ResultSet[Tag]:
+    card = fields["_header"].select_one(".profile-header-mobile-status > .card > .card-body")
+    return card.find_all("p", {"class": "text-right"}, recursive=False)  # type: ignore
 
-        # Extract Avatar
-        icon = header.find("span", {"class": "icon-user"})  # type: ignore
-        result._avatar = RE_BACKGROUND_IMAGE.search(icon.attrs.get("style")).group(1)  # type: ignore
 
-        card = header.select_one(".profile-header-mobile-status > .card > .card-body")  # type: ignore
-        info: ResultSet[Tag] = card.find_all("p", {"class": "text-right"}, recursive=False)  # type: ignore
+def _avatar(fields: LazyFields) -> str:
+    icon = fields["_header"].find("span", {"class": "icon-user"})
+    return RE_BACKGROUND_IMAGE.search(icon.attrs.get("style")).group(1)  # type: ignore
 
-        # Extract Last Seen
-        result._last_seen = None
-        last_seen = info[0].span
-        if last_seen is not None:
-            result._last_seen = datetime.strptime(last_seen.attrs.get("title"), DATE_FORMAT)  # type: ignore
 
-        # Extract Satus Info
-        result._date_joined = datetime.strptime(info[1].text, DATE_FORMAT)
-        result._team = info[2].text
+def _last_seen(fields: LazyFields) -> Optional[datetime]:
+    last_seen = fields["_info"][0].span
+    if last_seen is None:
+        return None
+    return datetime.strptime(last_seen.attrs.get("title"), DATE_FORMAT)  # type: ignore
 
-        # Extract Links
-        result._links = {}
-        links: ResultSet[Tag] = soup.select_one(".profile-links").find("table")  # type: ignore
-        for site, cell in table_to_dict(links).items():  # type: ignore
-            url = cell.a.attrs["href"]  # type: ignore
-            result._links[site] = url
 
+def _date_joined(fields: LazyFields) -> datetime:
+    return datetime.strptime(fields["_info"][1].text, DATE_FORMAT)
+
+
+def _team(fields: LazyFields) -> str:
+    return fields["_info"][2].text
+
+
+def _links(fields: LazyFields) -> Dict[str, str]:
+    result: Dict[str, str] = {}
+    links: Tag = fields.soup.select_one(".profile-links").find("table")  # type: ignore
+    for site, cell in table_to_dict(links).items():
+        result[site] = cell.a.attrs["href"]  # type: ignore
+    return result
+
+
+class ProfileParser(BaseParser["User"]):
+    _FIELDS = {
+        "_header": _header,
+        "_info": _info,
+        "avatar": _avatar,
+        "last_seen": _last_seen,
+        "date_joined": _date_joined,
+        "team": _team,
+        "links": _links,
+    }
+    _REGIONS = RegionStrainer(classes=("profile-header", "profile-links"))
+    _STORE = "user"
+    _ROUTE = "/~%s"
+
+    @classmethod
+    def parse(cls, data: str, *args: Any, engine: ParserEngine = "html.parser") -> Dict[str, Any]:
+        return dict(LazyFields(cls.soup(data, engine), cls._FIELDS))
+
+    def build(self, parsed: Mapping[str, Any], *args: Any) -> User:
+        result = User.intern(args[0], self.http)
+        result._data = parsed
         return result
 
 
 class AttackListParser(BaseParser[Tuple[List["PartialAttack"], bool]]):
+    _REGIONS = RegionStrainer(classes=("profile-attacks-body",))
+    _PRIORITY = Priority.BULK
     _ROUTE = "/~%s/attacks?page=%s"
 
-    def parse(self, data: str, *args: Any) -> Tuple[List[attack.PartialAttack], bool]:
-        result: List[attack.PartialAttack] = []
-        soup = BeautifulSoup(data, features="html.parser")
+    @classmethod
+    def parse(
+        cls,
+        data: str,
+        *args: Any,
+        engine: ParserEngine = "html.parser",
+    ) -> Tuple[List[int], bool]:
+        scanned = cls.scan(data)
+        if scanned is not None:
+            return scanned
+        _log.debug("Attack list page does not have the expected layout; parsing it in full...")
+        return cls.parse_document(data, *args, engine=engine)
+
+    @staticmethod
+    def scan(data: str) -> Optional[Tuple[List[int], bool]]:
+        """Extracts the attack ids and end of list flag from a page without building its tree.
+
+        The scanner only accepts the exact layout served by artfight.net,
+        anything it can't be certain of yields `None` so the page can be parsed in full instead.
+
+        Parameters
+        ----------
+        data : str
+            The attack list page.
+
+        Returns
+        -------
+        tuple[list[int], bool], optional
+            The same result as `parse_document`, or `None` if the page could not be scanned.
+        """
+        first = data.find("profile-attacks-body")
+        tag = data.rfind("<", 0, first)
+        if first == -1 or tag == -1:
+            return None
+        body = RE_ATTACKS_BODY.match(data, tag)
+        if body is None or body.end() <= first:
+            return None
+        attributes = _attributes(body.group(1))
+        if attributes is None or "profile-attacks-body" not in _classes(attributes):
+            return None
+
+        # The body must not be quoted by a script or comment, or named by a reference, before it
+        for opening, closing in (("<script", "</script>"), ("<!--", "-->")):
+            start = data.rfind(opening, 0, body.start())
+            if start != -1 and data.find(closing, start, body.start()) == -1:
+                return None
+        if RE_CLASS_REFERENCE.search(data[: body.start()].lower()):
+            return None
+
+        list = RE_ATTACK_LIST.match(data, body.end())
+        if list is None:
+            return None
+        if list.group(1) is None:
+            # the body closed without a list
+            return None if RE_UNSCANNABLE.search(data, body.start(), list.end()) else ([], True)
+        attributes = _attributes(list.group(1))
+        if attributes is None or " ".join(_classes(attributes)) != "row clearfix":
+            return None
+
+        # Extract List
+        result: List[int] = []
+        position = list.end()
+        card = RE_ATTACK_CARD.match(data, position)
+        while card is not None:
+            attributes = _attributes(card.group(1))
+            id = None if attributes is None else attributes.get("data-id")
+            if id is None or not id.isascii() or not id.isdigit():
+                return None
+            result.append(int(id))
+            position = card.end()
+            card = RE_ATTACK_CARD.match(data, position)
+
+        # Extract EOF
+        nav = RE_ATTACK_PAGINATION.match(data, position)
+        if nav is None:
+            end = RE_ATTACKS_BODY_END.match(data, position)
+            if end is None or RE_UNSCANNABLE.search(data, body.start(), end.end()):
+                return None
+            return result, True
+        if RE_UNSCANNABLE.search(data, body.start(), nav.end()):
+            return None
+        attributes = _attributes(nav.group(1))
+        if attributes is None or "pagination" not in _classes(attributes):
+            return None
+
+        # Every child of the pagination must be an item
+        items = nav.group(2)
+        item = last = RE_LIST_ITEM.match(items)
+        while item is not None:
+            last = item
+            item = RE_LIST_ITEM.match(items, item.end())
+        if last is None or items.find("<", last.end()) != -1:
+            return None
+        attributes = _attributes(last.group(1))
+        if attributes is None:
+            return None
+        return result, attributes.get("aria-disabled") == "true"
+
+    @classmethod
+    def parse_document(
+        cls,
+        data: str,
+        *args: Any,
+        engine: ParserEngine = "html.parser",
+    ) -> Tuple[List[int], bool]:
+        """Parses an attack list page by building its tree, handling any layout `scan` rejects."""
+        result: List[int] = []
+        soup = cls.soup(data, engine)
 
         # Extract List
         body: Tag = soup.select_one(".profile-attacks-body")  # type: ignore
@@ -68,8 +267,7 @@ class AttackListParser(BaseParser[Tuple[List["PartialAttack"], bool]]):
 
         attacks: ResultSet[Tag] = list.find_all("div", recursive=False)  # type: ignore
         for a in attacks:
-            id = int(a.a.attrs.get("data-id"))  # type: ignore
-            result.append(attack.PartialAttack(id, self.http))
+            result.append(int(a.a.attrs.get("data-id")))  # type: ignore
 
         # Extract EOF
         eof = True
@@ -79,10 +277,210 @@ class AttackListParser(BaseParser[Tuple[List["PartialAttack"], bool]]):
 
         return result, eof
 
+    def build(
+        self,
+        parsed: Tuple[List[int], bool],
+        *args: Any,
+    ) -> Tuple[List[attack.PartialAttack], bool]:
+        ids, eof = parsed
+        return [attack.PartialAttack(id, self.http) for id in ids], eof
+
+    def stream(self, *args: Any) -> AttackListStream:
+        """Fetches and parses an attack list page incrementally as it is recieved.
+
+        Streamed pages bypass the response cache and are not coalesced with concurrent runs.
+
+        Parameters
+        ----------
+        args : tuple[Any]
+            The arguments supplied when calling the parser.
+
+        Returns
+        -------
+        AttackListStream
+            An asynchronous iterator over the attacks on the page.
+        """
+        return AttackListStream(self, args)
+
+
+class AttackListFeed(HTMLParser):
+    """Incrementally extracts attack ids from an attack list page, mirroring `AttackListParser.parse`."""
+
+    _VOID = frozenset(
+        ("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr")
+    )
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._stack: List[str] = []
+        self._body: Union[int, None] = None
+        self._list: Union[int, None] = None
+        self._card: Union[int, None] = None
+        self._nav: Union[int, None] = None
+        self._pagination: Union[int, None] = None
+        self._card_id: Union[int, None] = None
+        self._last_item: Union[Dict[str, Optional[str]], None] = None
+        self._done: Dict[str, bool] = {"body": False, "list": False, "nav": False}
+        self._ids: List[int] = []
+
+    @property
+    def eof(self) -> bool:
+        """Wether this is the last page of attacks, only accurate once the whole page has been fed."""
+        if not self._done["list"] or not self._done["nav"]:
+            return True
+        if self._last_item is None:
+            raise ParseError("Attack list pagination has no items")
+        return self._last_item.get("aria-disabled") == "true"
+
+    def drain(self) -> List[int]:
+        """Returns the attack ids extracted since the last call."""
+        ids, self._ids = self._ids, []
+        return ids
+
+    def close(self) -> None:
+        super().close()
+        if not self._done["body"]:
+            raise ParseError("Attack list page has no .profile-attacks-body")
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._start(tag, dict(attrs), void=True)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._start(tag, dict(attrs), void=tag in self._VOID)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in self._stack:
+            return
+        while self._stack:
+            depth = len(self._stack)
+            if self._card == depth:
+                if self._card_id is None:
+                    raise ParseError("Attack card has no link")
+                self._card = None
+            for region in ("_body", "_list", "_nav", "_pagination"):
+                if getattr(self, region) == depth:
+                    setattr(self, region, None)
+            if self._stack.pop() == tag:
+                return
+
+    def _start(self, tag: str, attrs: Dict[str, Optional[str]], void: bool) -> None:
+        depth = len(self._stack) + 1
+        classes = (attrs.get("class") or "").split()
+
+        if self._body is None:
+            if not self._done["body"] and "profile-attacks-body" in classes:
+                self._done["body"] = True
+                self._body = depth
+        else:
+            # the first div.row.clearfix holds the cards
+            if self._list is None:
+                if not self._done["list"] and tag == "div" and attrs.get("class") == "row clearfix":
+                    self._done["list"] = True
+                    self._list = depth
+            elif self._card is None:
+                if tag == "div" and depth == self._list + 1:
+                    self._card, self._card_id = depth, None
+            elif self._card_id is None and tag == "a":
+                id = attrs.get("data-id")
+                if id is None:
+                    raise ParseError("Attack card link has no data-id")
+                self._card_id = int(id)
+                self._ids.append(self._card_id)
+
+            # the first nav holds the pagination
+            if self._nav is None:
+                if not self._done["nav"] and tag == "nav":
+                    self._done["nav"] = True
+                    self._nav = depth
+            elif self._pagination is None:
+                if tag == "ul" and "pagination" in classes:
+                    self._pagination = depth
+            elif tag == "li" and depth == self._pagination + 1:
+                self._last_item = attrs
+
+        if not void:
+            self._stack.append(tag)
+
+
+class AttackListStream:
+    """Asynchronously iterates over the attacks on an attack list page as it is recieved.
+
+    Parameters
+    ----------
+    parser : AttackListParser
+        The parser to fetch the page with.
+    args : tuple[Any]
+        The arguments supplied when calling the parser.
+    """
+
+    def __init__(self, parser: AttackListParser, args: Tuple[Any, ...]) -> None:
+        self._parser: AttackListParser = parser
+        self._args: Tuple[Any, ...] = args
+        self._sent: int = 0
+        self.eof: bool = True
+
+    def __aiter__(self) -> AsyncIterator[attack.PartialAttack]:
+        return self._iterate()
+
+    async def _read(self, response: aiohttp.ClientResponse, queue: asyncio.Queue[List[int]]) -> bool:
+        decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+        feed = AttackListFeed()
+        seen = 0
+
+        def forward() -> None:
+            # a retried request starts again from the top of the page, skip what was already sent
+            nonlocal seen
+            ids = feed.drain()
+            skip = max(0, self._sent - seen)
+            new = ids[skip:]
+            seen += len(ids)
+            if new:
+                queue.put_nowait(new)
+                self._sent = seen
+
+        async for chunk in response.content.iter_any():
+            feed.feed(decoder.decode(chunk))
+            forward()
+        feed.feed(decoder.decode(b"", final=True))
+        feed.close()
+        forward()
+        return feed.eof
+
+    async def _iterate(self) -> AsyncIterator[attack.PartialAttack]:
+        parser, args = self._parser, self._args
+        queue: asyncio.Queue[Union[List[int], None]] = asyncio.Queue()
+        self._sent = 0
+
+        async def produce() -> bool:
+            try:
+                return await parser.http.request(
+                    parser._METHOD,
+                    parser._ROUTE % args,
+                    priority=parser._PRIORITY,
+                    reader=lambda response: self._read(response, queue),  # type: ignore
+                )
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.ensure_future(produce())
+        try:
+            while True:
+                ids = await queue.get()
+                if ids is None:
+                    break
+                for id in ids:
+                    yield attack.PartialAttack(id, parser.http)
+            self.eof = await task
+        finally:
+            if not task.done():
+                task.cancel()
+
 
 class PartialUser(ArtfightObject[str, "User"]):
     """Represents an Artfight user that does not have all data present."""
 
+    __slots__ = ()
+
     _PARSER = ProfileParser
     _URL = "/~%s"
 
@@ -91,56 +489,130 @@ class PartialUser(ArtfightObject[str, "User"]):
         """The username of this artfight user."""
         return self.id
 
-    async def fetch_attacks(self) -> AsyncIterator[attack.PartialAttack]:
+    async def fetch_attacks(
+        self,
+        prefetch: int = 1,
+        stream: bool = False,
+        since: Optional[int] = None,
+    ) -> AsyncIterator[attack.PartialAttack]:
         """Asynchronously fetches all the attacks this user has made.
 
+        Parameters
+        ----------
+        prefetch : int, optional
+            The maximum number of attack list pages to request concurrently, by default 1.
+            Pages are still yielded in order and no pages past the last one are consumed.
+        stream : bool, optional
+            Wether to yield attacks as soon as they are recieved instead of once their page has been parsed,
+            by default False. Streamed pages bypass the response cache and object store.
+        since : int, optional
+            If specified, stop once an attack with this id or older is reached, by default None.
+            Attacks are listed newest first, so only attacks newer than `since` are fetched.
+
         Returns
         -------
         AsyncIterator[attack.PartialAttack]
             The `PartialAttacks` representing this user's attacks.
+
+        Raises
+        ------
+        ValueError
+            Raised when `prefetch` is less than 1, or greater than 1 when streaming.
         """
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        if stream and prefetch > 1:
+            raise ValueError("prefetch is not supported when streaming")
+
         parser = AttackListParser(self._http)
-        eof = False
-        count = 1
-        while not eof:
-            page, eof = await parser.run(self.name, count)
-            for i in page:
-                yield i
-            count += 1
+        if stream:
+            count = 1
+            while True:
+                page = parser.stream(self.name, count)
+                async for i in page:
+                    if since is not None and i.id <= since:
+                        return
+                    yield i
+                if page.eof:
+                    return
+                count += 1
+
+        pages = windowed((parser.run(self.name, count) for count in itertools.count(1)), prefetch)
+        try:
+            async for page, eof in pages:
+                for i in page:
+                    if since is not None and i.id <= since:
+                        return
+                    yield i
+                if eof:
+                    return
+        finally:
+            # cancel requests for pages past the end
+            await pages.aclose()
+
+    async def sync_attacks(
+        self,
+        prefetch: int = 1,
+        stream: bool = False,
+    ) -> List[attack.PartialAttack]:
+        """Fetches the attacks this user has made since the last sync.
+
+        The newest attack id is kept as a watermark in the client's `ObjectStore`, if it has one,
+        so each sync only requests the pages containing new attacks.
+        Without a store every sync returns all of the user's attacks.
+
+        Parameters
+        ----------
+        prefetch : int, optional
+            The maximum number of attack list pages to request concurrently, by default 1.
+        stream : bool, optional
+            Wether to stream attack list pages, by default False.
+
+        Returns
+        -------
+        List[attack.PartialAttack]
+            The `PartialAttacks` representing the user's new attacks, newest first.
+        """
+        store = self._http.store
+        since = None if store is None else store.get_watermark("attacks", self.name)
+        result = [i async for i in self.fetch_attacks(prefetch, stream, since)]
+
+        # only advance the watermark once every new attack has been seen
+        if store is not None and result:
+            store.set_watermark("attacks", self.name, max(i.id for i in result))
+        return result
 
 
 class User(PartialUser):
     """Represents an Artfight user."""
 
+    __slots__ = ("_data",)
+
     def __init__(self, id: str, http: HTTPClient) -> None:
         super().__init__(id, http)
-        self._last_seen: datetime | None
-        self._links: Dict[str, str]
-        self._date_joined: datetime
-        self._avatar: str
-        self._team: str
+        self._data: Mapping[str, Any]
 
     @property
     def avatar(self) -> str:
         """The URL of this user's avatar."""
-        return self._avatar
+        return self._data["avatar"]
 
     @property
     def date_joined(self) -> datetime:
         """The datetime of when this user joined artfight."""
-        return self._date_joined
+        return self._data["date_joined"]
 
     @property
     def last_seen(self) -> datetime | None:
         """The datetime of when this user was last seen online, `None` if hidden."""
-        return self._last_seen
+        return self._data["last_seen"]
 
     @property
     def team(self) -> str:
         """The team this user is part of."""
-        return self._team
+        return self._data["team"]
 
     @property
     def links(self) -> Dict[str, str]:
         """Dictionary containing this user's social links."""
-        return self._links
+        return self._data["links"]
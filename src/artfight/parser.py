@@ -1,22 +1,162 @@
 from __future__ import annotations
 
 import logging
+import time
 import traceback
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TypeVar
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, Mapping, Optional, TypeVar
+
+from bs4 import BeautifulSoup, SoupStrainer
 
 from artfight import __repo__, error
+from artfight.engine import ParserEngine
 from artfight.http import HTTPClient
+from artfight.scheduler import Priority
 from artfight.util import Method
 
 _log = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
-__all__ = ("BaseParser",)
+__all__ = ("BaseParser", "RegionStrainer", "LazyFields")
+
+Extractor = Callable[["LazyFields"], Any]
+
+
+class RegionStrainer(SoupStrainer):
+    """Restricts tree building to the regions of a page a parser needs.
+
+    Only elements with one of the provided classes or ids, and everything inside them, are built.
+    The rest of the document, such as navigation, footers and scripts, is discarded while parsing.
+
+    Parameters
+    ----------
+    classes : Iterable[str], optional
+        The CSS classes of the regions to build, by default none.
+    ids : Iterable[str], optional
+        The ids of the regions to build, by default none.
+    """
+
+    def __init__(self, classes: Iterable[str] = (), ids: Iterable[str] = ()) -> None:
+        super().__init__()
+        self.classes: frozenset[str] = frozenset(classes)
+        self.ids: frozenset[str] = frozenset(ids)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} classes={sorted(self.classes)} ids={sorted(self.ids)}>"
+
+    def matches(self, attrs: Optional[Dict[str, Any]]) -> bool:
+        """Checks whether a tag with the provided attributes starts a region.
+
+        Parameters
+        ----------
+        attrs : Dict[str, Any], optional
+            The raw attributes of the tag.
+
+        Returns
+        -------
+        bool
+            Wether the tag and its contents should be built.
+        """
+        if not attrs:
+            return False
+        if attrs.get("id") in self.ids:
+            return True
+        value = attrs.get("class")
+        if value is None:
+            return False
+        if isinstance(value, str):
+            value = value.split()
+        return not self.classes.isdisjoint(value)
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(
+        self,
+        nsprefix: Optional[str],
+        name: str,
+        attrs: Optional[Dict[str, Any]],
+    ) -> bool:
+        return self.matches(attrs)
+
+    def allow_string_creation(self, string: str) -> bool:
+        return False
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name: Any = None, markup_attrs: Any = {}) -> Any:
+        return markup_name if self.matches(markup_attrs) else None
+
+
+class LazyFields(Mapping[str, Any]):
+    """The fields of a parsed page, each extracted on first access and memoized.
+
+    Fields starting with an underscore are shared intermediate regions, they can be looked up
+    but are excluded from iteration.
+
+    Parameters
+    ----------
+    soup : BeautifulSoup
+        The parsed regions of the page.
+    extractors : Mapping[str, Extractor]
+        The functions extracting each field, keyed by field name.
+    source : str, optional
+        A description of the page used in error messages, by default "page".
+    """
+
+    __slots__ = ("soup", "_extractors", "_values", "_source")
+
+    def __init__(
+        self,
+        soup: BeautifulSoup,
+        extractors: Mapping[str, Extractor],
+        source: str = "page",
+    ) -> None:
+        self._extractors: Mapping[str, Extractor] = extractors
+        self._values: Dict[str, Any] = {}
+        self._source: str = source
+        self.soup: BeautifulSoup = soup
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} source={self._source!r} extracted={sorted(self._values)}>"
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+
+        extractor = self._extractors[name]
+        try:
+            value = extractor(self)
+        except (AttributeError, IndexError) as e:
+            raise error.ParseError(f"Error parsing {name!r} from {self._source}") from e
+        self._values[name] = value
+        return value
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._extractors
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self._extractors if not name.startswith("_"))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
 
 
 class BaseParser(ABC, Generic[T]):
+    """Fetches and parses a page from the artfight website.
+
+    Parsing happens in two stages so that it can be offloaded to a worker pool.
+    `parse` turns the markdown into plain, picklable data and may run on any thread or process.
+    `build` turns that data into the resultant objects and always runs on the event loop.
+
+    Parsers declaring `_FIELDS` may instead defer extracting each field until it is first accessed,
+    in which case `build` recieves a `LazyFields` mapping in place of the output of `parse`.
+    """
+
+    _FIELDS: Optional[Mapping[str, Extractor]] = None
+    _REGIONS: Optional[RegionStrainer] = None
+    _PRIORITY: Priority = Priority.INTERACTIVE
+    _STORE: Optional[str] = None
     _METHOD: Method = "GET"
     _ROUTE: str
 
@@ -26,7 +166,14 @@ class BaseParser(ABC, Generic[T]):
     async def run(self, *args: Any) -> T:
         """Run the parser and returned the result.
 
-        Wrapper around `fetch` and `parse`
+        Wrapper around `fetch`, `parse` and `build`,
+        `parse` is run on the HTTP client's `ParseExecutor` using its `ParserEngine`.
+        If the parser declares a store kind and the HTTP client has an `ObjectStore`,
+        fresh stored results are built without fetching and new results are stored.
+        If the HTTP client has lazy fields enabled and there is no store to fill,
+        only the document tree is built and fields are extracted as they are accessed.
+        Concurrent runs of the same parser with the same arguments share a single result.
+        If the HTTP client has `Metrics`, the time taken to parse and build and the page length are recorded.
 
         Parameters
         ----------
@@ -43,11 +190,33 @@ class BaseParser(ABC, Generic[T]):
         error.ParseError
             Raised when there is an error parsing the markdown, ensure you are using the latest version.
         """
+        return await self.http.inflight.run((type(self), args), self._run, *args)
+
+    async def _run(self, *args: Any) -> T:
+        store = self.http.store if self._STORE is not None else None
+        if store is not None:
+            parsed = store.get(self._STORE, args[0])  # type: ignore
+            if parsed is not None:
+                return self.build(parsed, *args)
+
         data: str = await self.fetch(*args)
 
+        executor, engine = self.http.parse_executor, self.http.parse_engine
+        # document trees can't cheaply leave a worker process, and stores need every field
+        lazy = self._FIELDS is not None and self.http.lazy_fields and store is None
+        lazy = lazy and executor.mode != "process"
+        metrics = self.http.metrics
+        start = time.perf_counter() if metrics is not None else 0
         try:
-            return self.parse(data, *args)
-        except (AttributeError, IndexError) as e:
+            if lazy:
+                soup = await executor.run(self.soup, data, engine)
+                parsed = LazyFields(soup, self._FIELDS, f"{type(self).__name__}{args}")  # type: ignore
+            else:
+                parsed = await executor.run(self.parse, data, *args, engine=engine)
+            result = self.build(parsed, *args)
+        except (AttributeError, IndexError, error.ParseError) as e:
+            if metrics is not None:
+                metrics.increment("artfight_parse_errors_total", (("parser", type(self).__name__),))
             msg = f"Error Parsing using {type(self)} : {args}"
             _log.error(
                 "%s - Please report this error to %s/issues/new\n%s",
@@ -57,6 +226,14 @@ class BaseParser(ABC, Generic[T]):
             )
             raise error.ParseError(msg) from e
 
+        if metrics is not None:
+            labels = (("parser", type(self).__name__),)
+            metrics.observe("artfight_parse_seconds", time.perf_counter() - start, labels)
+            metrics.observe("artfight_parse_document_characters", len(data), labels)
+        if store is not None:
+            store.put(self._STORE, args[0], parsed)  # type: ignore
+        return result
+
     async def fetch(self, *args: Any) -> str:
         """Fetches the markdown for the parser.
 
@@ -70,18 +247,61 @@ class BaseParser(ABC, Generic[T]):
         str
             The fetched markdown.
         """
-        return await self.http.request(self._METHOD, self._ROUTE % args)
+        return await self.http.request(self._METHOD, self._ROUTE % args, priority=self._PRIORITY)
+
+    @classmethod
+    def soup(cls, data: str, engine: ParserEngine = "html.parser") -> BeautifulSoup:
+        """Builds the document tree for the provided markdown.
+
+        Only the parser's regions are built, if it declares any.
+
+        Parameters
+        ----------
+        data : str
+            The markdown to build a tree from.
+        engine : ParserEngine, optional
+            The engine used to build the tree, by default "html.parser".
 
+        Returns
+        -------
+        BeautifulSoup
+            The document tree.
+        """
+        return BeautifulSoup(data, features=engine, parse_only=cls._REGIONS)
+
+    @classmethod
     @abstractmethod
-    def parse(self, data: str, *args: Any) -> T:
+    def parse(cls, data: str, *args: Any, engine: ParserEngine = "html.parser") -> Any:
         """Parses the markdown recieved from the fetch method.
 
+        This may be run outside of the event loop so must not depend on the parser's state,
+        the returned data must be picklable.
+
         Parameters
         ----------
         data : str
             The markdown recieved.
         args : tuple[Any]
             The arguments supplied when calling the parser.
+        engine : ParserEngine, optional
+            The engine used to build the document tree, by default "html.parser".
+
+        Returns
+        -------
+        Any
+            The extracted data, to be supplied to `build`.
+        """
+
+    @abstractmethod
+    def build(self, parsed: Any, *args: Any) -> T:
+        """Builds the resultant object from the data returned by the parse method.
+
+        Parameters
+        ----------
+        parsed : Any
+            The data returned by `parse`.
+        args : tuple[Any]
+            The arguments supplied when calling the parser.
 
         Returns
         -------
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import errno
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, Mapping, Optional
+
+import aiohttp
+
+__all__ = ("RetryPolicy", "DEFAULT_RETRY_STATUSES")
+
+# The maximum number of attempts for each retryable status.
+DEFAULT_RETRY_STATUSES: Dict[int, int] = {
+    429: 5,
+    500: 3,
+    502: 5,
+    503: 5,
+    504: 5,
+    524: 5,
+}
+
+# Connection resets on Linux, macOS and Windows, along with other transient socket errors.
+RETRY_ERRNOS: FrozenSet[int] = frozenset(
+    (
+        errno.ECONNRESET,
+        errno.ECONNABORTED,
+        errno.ECONNREFUSED,
+        errno.EPIPE,
+        errno.ETIMEDOUT,
+        54,
+        10054,
+    )
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses the value of a `Retry-After` header.
+
+    Parameters
+    ----------
+    value : str, optional
+        The header value, either a number of seconds or an HTTP date.
+
+    Returns
+    -------
+    Optional[float]
+        The number of seconds to wait, or `None` if the value is missing or invalid.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Decides whether failed requests are retried and how long to wait between attempts.
+
+    Waits use exponential backoff with full jitter, lengthened to honour any `Retry-After` header.
+
+    Parameters
+    ----------
+    attempts : int, optional
+        The maximum number of attempts for a request, by default 5.
+    base : float, optional
+        The backoff in seconds before the second attempt, doubling each attempt after, by default 0.5.
+    cap : float, optional
+        The maximum backoff in seconds, excluding `Retry-After`, by default 30.
+    deadline : float, optional
+        The maximum number of seconds to spend on a request including retries, by default 120.
+        `None` for no deadline.
+    statuses : Mapping[int, int], optional
+        The maximum number of attempts keyed by retryable status, by default `DEFAULT_RETRY_STATUSES`.
+        Responses with any other status are never retried.
+    max_delay : float, optional
+        The longest `Retry-After` in seconds to wait for, by default 300. Requests asked to wait longer
+        are given up on instead of sleeping past any sensible limit. `None` to always wait.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 5,
+        base: float = 0.5,
+        cap: float = 30,
+        deadline: Optional[float] = 120,
+        statuses: Optional[Mapping[int, int]] = None,
+        max_delay: Optional[float] = 300,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        if statuses is None:
+            statuses = DEFAULT_RETRY_STATUSES
+        self.statuses: Mapping[int, int] = statuses
+        self.deadline: Optional[float] = deadline
+        self.max_delay: Optional[float] = max_delay
+        self.attempts: int = attempts
+        self.base: float = base
+        self.cap: float = cap
+        self.backoff_time: float = 0
+        self.retries: int = 0
+        self.giveups: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} attempts={self.attempts} retries={self.retries} giveups={self.giveups}>"
+
+    def retries_status(self, status: int) -> bool:
+        """Wether responses with the provided status may be retried."""
+        return status in self.statuses
+
+    def retries_exception(self, exception: BaseException) -> bool:
+        """Wether requests which raised the provided exception may be retried."""
+        if isinstance(exception, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return True
+        return isinstance(exception, OSError) and exception.errno in RETRY_ERRNOS
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Returns the number of seconds to wait after the provided attempt failed.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of attempts made so far.
+        retry_after : float, optional
+            The wait requested by the server, by default None.
+
+        Returns
+        -------
+        float
+            The number of seconds to wait.
+        """
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def next_delay(
+        self,
+        attempt: int,
+        elapsed: float,
+        status: Optional[int] = None,
+        retry_after: Optional[str] = None,
+    ) -> Optional[float]:
+        """Decides whether to retry a failed attempt and records the decision.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of attempts made so far.
+        elapsed : float
+            The number of seconds spent on the request so far.
+        status : int, optional
+            The status of the failed response, `None` if the request raised an exception.
+        retry_after : str, optional
+            The value of the response's `Retry-After` header, by default None.
+
+        Returns
+        -------
+        Optional[float]
+            The number of seconds to wait before retrying, or `None` to give up.
+        """
+        limit = self.attempts
+        if status is not None:
+            limit = min(limit, self.statuses.get(status, 1))
+
+        delay = self.backoff(attempt, parse_retry_after(retry_after))
+        expired = self.deadline is not None and elapsed + delay > self.deadline
+        # checked on its own so a server can't stall requests without a deadline indefinitely
+        excessive = self.max_delay is not None and delay > self.max_delay
+        if attempt >= limit or expired or excessive:
+            self.giveups += 1
+            return None
+
+        self.backoff_time += delay
+        self.retries += 1
+        return delay
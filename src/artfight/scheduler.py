@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+__all__ = ("Priority", "TokenBucket", "RequestScheduler")
+
+
+class Priority(IntEnum):
+    """The priority of a request, lower values are sent first."""
+
+    LOGIN = 0
+    INTERACTIVE = 1
+    BULK = 2
+
+
+class TokenBucket:
+    """A token bucket rate limiter.
+
+    Parameters
+    ----------
+    rate : float
+        The number of tokens added per second.
+    burst : int, optional
+        The maximum number of tokens the bucket can hold, by default 1.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self._updated: float = time.monotonic()
+        self._tokens: float = burst
+        self._burst: int = burst
+        self._rate: float = rate
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Returns the number of seconds until a token is available, 0 if one is available now."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0
+        return (1 - self._tokens) / self._rate
+
+    def take(self) -> None:
+        """Removes a token from the bucket."""
+        self._refill()
+        self._tokens -= 1
+
+
+class RequestScheduler:
+    """Schedules requests according to a rate limit, a concurrency limit and their priority.
+
+    Waiting requests are dispatched in priority order, and in arrival order within a priority.
+
+    Parameters
+    ----------
+    rate : float, optional
+        The maximum number of requests sent per second, by default unlimited.
+    burst : int, optional
+        The number of requests that may be sent at once when under the rate limit, by default 1.
+    max_in_flight : int, optional
+        The maximum number of requests in progress at once, by default unlimited.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 1,
+        max_in_flight: Optional[int] = None,
+    ) -> None:
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self._bucket: Union[TokenBucket, None] = None if rate is None else TokenBucket(rate, burst)
+        self._queue: List[Tuple[int, int, asyncio.Future[None]]] = []
+        self._timer: Union[asyncio.TimerHandle, None] = None
+        self._max_in_flight: Optional[int] = max_in_flight
+        self._counter = itertools.count()
+        self._waiting: int = 0
+        self._in_flight: int = 0
+        self.total_wait: float = 0
+        self.max_wait: float = 0
+        self.dispatched: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} queue_depth={self.queue_depth} in_flight={self.in_flight}>"
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of requests waiting to be sent."""
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently in progress."""
+        return self._in_flight
+
+    def _dispatch(self) -> None:
+        """Grants slots to waiting requests while the limits allow it."""
+        self._timer = None
+        while self._queue:
+            if self._max_in_flight is not None and self._in_flight >= self._max_in_flight:
+                return
+            if self._queue[0][2].done():
+                heapq.heappop(self._queue)  # cancelled while waiting
+                continue
+            if self._bucket is not None:
+                delay = self._bucket.delay()
+                if delay > 0:
+                    loop = asyncio.get_running_loop()
+                    self._timer = loop.call_later(delay, self._dispatch)
+                    return
+                self._bucket.take()
+
+            _, _, future = heapq.heappop(self._queue)
+            self._waiting -= 1
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        if self._timer is None:
+            self._dispatch()
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Waits until a request with the provided priority may be sent.
+
+        Every call must be paired with a call to `release`.
+
+        Parameters
+        ----------
+        priority : Priority, optional
+            The priority of the request, by default `Priority.INTERACTIVE`.
+        """
+        start = time.monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), future))
+        self._waiting += 1
+        if self._timer is None:
+            self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._waiting -= 1
+            else:
+                # the slot was granted after cancelling
+                self._release()
+            raise
+
+        waited = time.monotonic() - start
+        self.max_wait = max(self.max_wait, waited)
+        self.total_wait += waited
+        self.dispatched += 1
+
+    def release(self) -> None:
+        """Frees the slot held by a request once it completes."""
+        self._release()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        """Holds a request slot for the duration of the context.
+
+        Parameters
+        ----------
+        priority : Priority, optional
+            The priority of the request, by default `Priority.INTERACTIVE`.
+        """
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
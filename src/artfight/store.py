@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Union
+
+__all__ = ("ObjectStore", "DEFAULT_STORE_TTLS")
+
+# Attacks are effectively immutable once submitted so are kept forever.
+DEFAULT_STORE_TTLS: Dict[str, Optional[float]] = {
+    "attack": None,
+    "user": 86400,
+}
+
+_DATETIME_KEY = "$dt"
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_KEY: value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _decode(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and _DATETIME_KEY in value:
+        return datetime.fromisoformat(value[_DATETIME_KEY])
+    return value
+
+
+class ObjectStore:
+    """A SQLite backed store of parsed artfight objects, allowing warm restarts.
+
+    Objects are stored in the form returned by their parser's `parse` method,
+    so restoring one skips both the network and the markdown parsing.
+
+    Parameters
+    ----------
+    path : Union[str, os.PathLike], optional
+        The path of the database file, by default the store is kept in memory.
+    ttls : Mapping[str, Optional[float]], optional
+        The number of seconds stored objects stay fresh keyed by kind, by default `DEFAULT_STORE_TTLS`.
+        Kinds without a ttl, or with a ttl of `None`, never expire.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike] = ":memory:",
+        ttls: Optional[Mapping[str, Optional[float]]] = None,
+    ) -> None:
+        if ttls is None:
+            ttls = DEFAULT_STORE_TTLS
+        self._ttls: Mapping[str, Optional[float]] = ttls
+        # the store may be opened on one thread and used on another, such as a `SyncArtfightClient`'s loop
+        self._db: sqlite3.Connection = sqlite3.connect(
+            path,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "kind TEXT NOT NULL, key NOT NULL, data TEXT NOT NULL, stored REAL NOT NULL, "
+            "PRIMARY KEY (kind, key)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            "kind TEXT NOT NULL, key NOT NULL, value INTEGER NOT NULL, "
+            "PRIMARY KEY (kind, key)) WITHOUT ROWID"
+        )
+
+    def __enter__(self) -> ObjectStore:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def get(self, kind: str, key: Union[str, int]) -> Optional[Any]:
+        """Returns a stored object if it exists and is still fresh.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of object, such as "attack" or "user".
+        key : Union[str, int]
+            The unique identifier of the object.
+
+        Returns
+        -------
+        Optional[Any]
+            The stored parser output, or `None` if missing or expired.
+        """
+        query = "SELECT data, stored FROM objects WHERE kind = ? AND key = ?"
+        row = self._db.execute(query, (kind, key)).fetchone()
+        if row is None:
+            return None
+
+        data, stored = row
+        ttl = self._ttls.get(kind)
+        if ttl is not None and stored + ttl <= time.time():
+            return None
+        return json.loads(data, object_hook=_decode)
+
+    def put(self, kind: str, key: Union[str, int], parsed: Any) -> None:
+        """Stores an object, replacing any previous version.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of object, such as "attack" or "user".
+        key : Union[str, int]
+            The unique identifier of the object.
+        parsed : Any
+            The output of the object's parser, must be JSON serializable aside from datetimes.
+        """
+        data = json.dumps(parsed, default=_encode, separators=(",", ":"), ensure_ascii=False)
+        self._db.execute(
+            "INSERT OR REPLACE INTO objects (kind, key, data, stored) VALUES (?, ?, ?, ?)",
+            (kind, key, data, time.time()),
+        )
+
+    def delete(self, kind: str, key: Union[str, int]) -> None:
+        """Removes an object from the store if it exists.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of object, such as "attack" or "user".
+        key : Union[str, int]
+            The unique identifier of the object.
+        """
+        self._db.execute("DELETE FROM objects WHERE kind = ? AND key = ?", (kind, key))
+
+    def get_watermark(self, kind: str, key: Union[str, int]) -> Optional[int]:
+        """Returns the newest id seen by the last sync of a collection.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of collection, such as "attacks".
+        key : Union[str, int]
+            The unique identifier of the collection's owner.
+
+        Returns
+        -------
+        Optional[int]
+            The stored watermark, or `None` if the collection has never been synced.
+        """
+        query = "SELECT value FROM watermarks WHERE kind = ? AND key = ?"
+        row = self._db.execute(query, (kind, key)).fetchone()
+        return None if row is None else row[0]
+
+    def set_watermark(self, kind: str, key: Union[str, int], value: int) -> None:
+        """Stores the newest id seen by a sync of a collection, replacing any previous watermark.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of collection, such as "attacks".
+        key : Union[str, int]
+            The unique identifier of the collection's owner.
+        value : int
+            The newest id seen.
+        """
+        self._db.execute(
+            "INSERT OR REPLACE INTO watermarks (kind, key, value) VALUES (?, ?, ?)",
+            (kind, key, value),
+        )
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        self._db.close()
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from artfight.client import ArtfightClient
+from artfight.object import Attack, PartialAttack, User
+
+__all__ = ("SyncArtfightClient",)
+
+R = TypeVar("R")
+
+
+class SyncArtfightClient:
+    """Represents a connection to Artfight for synchronous code.
+
+    The client runs an `ArtfightClient` on an event loop in a background thread which lives as long as it does,
+    so connections and the login session are reused across calls instead of being discarded by `asyncio.run`.
+    Its methods may be called from any number of threads at once, each call blocking until it completes.
+
+    Objects returned by the client belong to its loop,
+    their coroutines must be run through `run` rather than awaited or passed to `asyncio.run`.
+
+    Parameters
+    ----------
+    username : str
+        The username to log in with.
+    password : str
+        The password to log in with.
+    timeout : float, optional
+        The maximum number of seconds each call may take, by default calls never time out.
+    options : Any
+        The options to create the `ArtfightClient` with, such as `cache` and `scheduler`.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        *,
+        timeout: Optional[float] = None,
+        **options: Any,
+    ) -> None:
+        self.timeout: Optional[float] = timeout
+        self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, name="artfight-sync", daemon=True)
+        # guards closing against calls starting on other threads
+        self._lock: threading.Lock = threading.Lock()
+        self._calls: Set[concurrent.futures.Future[Any]] = set()
+        self._closed: bool = False
+        self._thread.start()
+
+        async def create() -> ArtfightClient:
+            # created on the loop, so anything bound to a loop binds to this one
+            return ArtfightClient(username, password, **options)
+
+        try:
+            self.client: ArtfightClient = self._call(create())
+        except BaseException:
+            self._stop()
+            raise
+
+    def __enter__(self) -> SyncArtfightClient:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the client and stop its background thread, waiting for calls in progress to complete.
+
+        Calls made once the client has started closing raise `RuntimeError`.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            calls = list(self._calls)
+        try:
+            concurrent.futures.wait(calls)
+            asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result()
+        finally:
+            self._stop()
+
+    def run(self, func: Callable[[ArtfightClient], Awaitable[R]]) -> R:
+        """Runs a coroutine function on the client's loop, returning its result.
+
+        Parameters
+        ----------
+        func : Callable[[ArtfightClient], Awaitable[R]]
+            The coroutine function to run, it is passed the underlying `ArtfightClient`.
+
+        Returns
+        -------
+        R
+            The result of the coroutine.
+        """
+
+        async def call() -> R:
+            return await func(self.client)
+
+        return self._call(call())
+
+    def fetch_user(self, name: str) -> User:
+        """Fetches an up-to-date instance of a user.
+
+        Parameters
+        ----------
+        name : str
+            The username of the user to fetch.
+
+        Returns
+        -------
+        User
+            An instance of `User` representing the fetched user.
+        """
+        return self._call(self.client.fetch_user(name))
+
+    def fetch_attack(self, id: int) -> Attack:
+        """Fetches an up-to-date instance of an Attack.
+
+        Parameters
+        ----------
+        id : int
+            The id of the attack to fetch.
+
+        Returns
+        -------
+        Attack
+            An instance of `Attack` representing the fetched attack.
+        """
+        return self._call(self.client.fetch_attack(id))
+
+    def fetch_users_many(
+        self,
+        names: Iterable[str],
+        *,
+        concurrency: int = 8,
+    ) -> List[Tuple[str, Union[User, Exception]]]:
+        """Fetches up-to-date instances of many users concurrently.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            The usernames of the users to fetch.
+        concurrency : int, optional
+            The maximum number of users fetched at once, by default 8.
+
+        Returns
+        -------
+        List[Tuple[str, Union[User, Exception]]]
+            Pairs of each username and either its `User` or the error raised while fetching it, in the order of `names`.
+        """
+        names = list(names)
+
+        async def collect() -> List[Tuple[str, Union[User, Exception]]]:
+            many = self.client.fetch_users_many(names, concurrency=concurrency, ordered=True)
+            return [result async for result in many]
+
+        return self._call(collect())
+
+    def fetch_attacks_many(
+        self,
+        ids: Iterable[int],
+        *,
+        concurrency: int = 8,
+    ) -> List[Tuple[int, Union[Attack, Exception]]]:
+        """Fetches up-to-date instances of many attacks concurrently.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            The ids of the attacks to fetch.
+        concurrency : int, optional
+            The maximum number of attacks fetched at once, by default 8.
+
+        Returns
+        -------
+        List[Tuple[int, Union[Attack, Exception]]]
+            Pairs of each attack id and either its `Attack` or the error raised while fetching it, in the order of `ids`.
+        """
+        ids = list(ids)
+
+        async def collect() -> List[Tuple[int, Union[Attack, Exception]]]:
+            many = self.client.fetch_attacks_many(ids, concurrency=concurrency, ordered=True)
+            return [result async for result in many]
+
+        return self._call(collect())
+
+    def fetch_attacks(self, name: str, **options: Any) -> List[PartialAttack]:
+        """Fetches all the attacks a user has made.
+
+        Parameters
+        ----------
+        name : str
+            The username of the user.
+        options : Any
+            The options of `PartialUser.fetch_attacks`, such as `prefetch` and `since`.
+
+        Returns
+        -------
+        List[PartialAttack]
+            The `PartialAttacks` representing the user's attacks, newest first.
+        """
+
+        async def collect() -> List[PartialAttack]:
+            return [i async for i in self.client.get_user(name).fetch_attacks(**options)]
+
+        return self._call(collect())
+
+    def sync_attacks(self, name: str, **options: Any) -> List[PartialAttack]:
+        """Fetches the attacks a user has made since the last sync.
+
+        Parameters
+        ----------
+        name : str
+            The username of the user.
+        options : Any
+            The options of `PartialUser.sync_attacks`, such as `prefetch`.
+
+        Returns
+        -------
+        List[PartialAttack]
+            The `PartialAttacks` representing the user's new attacks, newest first.
+        """
+
+        async def sync() -> List[PartialAttack]:
+            return await self.client.get_user(name).sync_attacks(**options)
+
+        return self._call(sync())
+
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    def _stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _call(self, coroutine: Coroutine[Any, Any, R]) -> R:
+        """Runs a coroutine on the loop from another thread, blocking until it completes."""
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("blocking calls cannot be made from the client's own loop, await the client instead")
+        with self._lock:
+            if self._closed:
+                coroutine.close()
+                raise RuntimeError("the client is closed")
+            future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+            self._calls.add(future)
+
+        try:
+            return future.result(self.timeout)
+        except BaseException:
+            # a timeout or interrupt abandons the call, so it shouldn't keep running on the loop
+            future.cancel()
+            raise
+        finally:
+            with self._lock:
+                self._calls.discard(future)
@@ -1,7 +1,29 @@
+from __future__ import annotations
+
+import asyncio
+import functools
 import re
-from typing import Dict, Literal, Union
+from collections import deque
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Literal,
+    TypeVar,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from bs4 import ResultSet, Tag
 
-from bs4 import ResultSet, Tag
+R = TypeVar("R")
 
 Method = Union[Literal["GET"], Literal["POST"], Literal["PUT"], Literal["DELETE"]]
 RE_BACKGROUND_IMAGE = re.compile(r"background-image: url\((.+)\)")
@@ -29,3 +51,122 @@ def table_to_dict(root: Tag) -> Dict[str, Tag]:
         if len(cells) > 1:
             result[cells[0].text.strip(": ")] = cells[1]
     return result
+
+
+class _Call:
+    """A call shared by a `SingleFlight`, along with the number of callers waiting on it."""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: "asyncio.Future[Any]") -> None:
+        self.future: "asyncio.Future[Any]" = future
+        self.waiters: int = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key into a single call.
+
+    The first caller for a key starts the call and any callers arriving before it completes share its result.
+    Cancelling a caller leaves the call running for the others, the call itself is only cancelled along with
+    its last caller.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, func: Callable[..., Awaitable[R]], *args: Any) -> R:
+        """Runs the provided coroutine function, or joins the call already in flight for the key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key identifying identical calls.
+        func : Callable[..., Awaitable[R]]
+            The coroutine function to call if no call is in flight.
+        args : tuple[Any]
+            The arguments to supply to the function.
+
+        Returns
+        -------
+        R
+            The result of the shared call.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(func(*args)))
+            call.future.add_done_callback(functools.partial(self._done, key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.future.done():
+                # every caller was cancelled, later callers start a new call instead of joining this one
+                self._forget(key, call)
+                call.future.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _done(self, key: Hashable, call: _Call, future: "asyncio.Future[Any]") -> None:
+        self._forget(key, call)
+        # mark the exception as retrieved in case every caller was cancelled
+        if not future.cancelled():
+            future.exception()
+
+
+async def windowed(
+    awaitables: Iterable[Awaitable[R]],
+    size: int,
+    ordered: bool = True,
+) -> AsyncIterator[R]:
+    """Runs awaitables concurrently, keeping up to `size` of them in flight, and yields their results.
+
+    Awaitables are only taken from the iterable as earlier ones complete. Closing the iterator early
+    cancels and waits for those still in flight, so none of their work outlives the iteration.
+
+    Parameters
+    ----------
+    awaitables : Iterable[Awaitable[R]]
+        The awaitables to run, consumed lazily.
+    size : int
+        The maximum number of awaitables in flight, at least 1.
+    ordered : bool, optional
+        Wether to yield results in the order of `awaitables` instead of as they complete, by default True.
+
+    Returns
+    -------
+    AsyncIterator[R]
+        The result of each awaitable.
+    """
+    iterator = iter(awaitables)
+    pending: Deque[asyncio.Future[R]] = deque()
+    try:
+        while True:
+            # keep the window of in-flight awaitables full
+            for awaitable in islice(iterator, size - len(pending)):
+                pending.append(asyncio.ensure_future(awaitable))
+            if not pending:
+                return
+
+            if ordered:
+                yield await pending.popleft()
+                continue
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in [f for f in pending if f in done]:
+                pending.remove(future)
+                yield future.result()
+    finally:
+        # discard work the caller no longer wants
+        for future in pending:
+            future.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)